@@ -1,5 +1,6 @@
 import curses
 import time
+from collections import deque
 
 from fire import fire
 from rocket import get_rocket
@@ -18,7 +19,7 @@ def play_the_game(canvas, tic):
     num_stars = round(height * width * 0.04)
 
     # stars
-    coroutines = list(get_stars(canvas, num_stars))
+    coroutines = deque(get_stars(canvas, num_stars))
     # explosion
     coroutines.append(fire(canvas, height // 2, width // 2))
     # rocket
@@ -32,15 +33,17 @@ def play_the_game(canvas, tic):
     # loop
     while coroutines:
 
-        for i, coroutine in enumerate(coroutines):
-            try:
-                if coroutine is None:
-                    continue
+        # finished coroutines are not put back to the queue
+        for _ in range(len(coroutines)):
+            coroutine = coroutines.popleft()
 
+            try:
                 coroutine.send(None)
 
             except StopIteration:
-                coroutines[i] = None
+                continue
+
+            coroutines.append(coroutine)
 
         canvas.refresh()
         time.sleep(tic)
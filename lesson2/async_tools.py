@@ -1,14 +1,18 @@
-import asyncio
+class WakeUp:
+    """Awaitable which passes number of tics to sleep to the loop, so the loop resumes coroutine only when it is due."""
 
+    __slots__ = ("tics", )
 
-async def sleep_for(tics):
+    def __init__(self, tics):
+        self.tics = tics
+
+    def __await__(self):
+        yield self.tics
+
+
+def sleep_for(tics):
 
     assert tics >= 0, AssertionError("Tics has to be positive")
 
     # if 0 then perform sleep once anyway
-    if not tics:
-        await asyncio.sleep(0)
-        return
-
-    for _ in range(tics):
-        await asyncio.sleep(0)
+    return WakeUp(tics or 1)
@@ -0,0 +1,260 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from random import choice, randint
+
+from async_tools import sleep_for
+from explosion import Explosions
+from fire import Shots
+from frames.tools import get_sprites
+from headless import HeadlessCanvas
+from obstacles import ObstaclesGrid
+from physics import Bodies
+from renderer import EXPLOSIONS_LAYER, GARBAGE_LAYER, ROCKET_LAYER, STARS_LAYER, Compositor
+from scheduler import RunQueue
+from space_garbage import fill_orbit_with_garbage, fly_garbage
+from stars import get_star_field
+
+
+async def spawn_garbage(canvas, coroutines, explosions, bodies, obstacles, obstacles_collisions, delay):
+    """Add garbage every delay tics, like fill_orbit_with_garbage does with the fixed delay."""
+
+    _, width = canvas.getmaxyx()
+    sprites = get_sprites("frames/garbage/*.txt")
+
+    while True:
+        sprite = choice(sprites)
+        column = randint(1, width - 1 - sprite.width)
+
+        coroutines.append(fly_garbage(canvas, explosions, bodies, obstacles, obstacles_collisions,
+                                      column, sprite, randint(1, 4) / 10))
+
+        await sleep_for(delay)
+
+
+async def spawn_bullets(canvas, shots, delay):
+    """Shoot from random column at the bottom every delay tics."""
+
+    height, width = canvas.getmaxyx()
+
+    while True:
+        shots.fire(height - 2, randint(1, width - 2), -2)
+
+        await sleep_for(delay)
+
+
+def create_world(options):
+    """Create headless canvas and run queue filled with the world's coroutines."""
+
+    random.seed(options.seed)
+
+    canvas_init = HeadlessCanvas(options.height, options.width)
+    canvas = Compositor(canvas_init)
+    canvas_stars = canvas.get_layer(STARS_LAYER)
+    canvas_garbage = canvas.get_layer(GARBAGE_LAYER)
+    canvas_explosions = canvas.get_layer(EXPLOSIONS_LAYER)
+    canvas_rocket = canvas.get_layer(ROCKET_LAYER)
+
+    coroutines = RunQueue()
+    obstacles = ObstaclesGrid()
+    obstacles_collisions = set()
+    bodies = Bodies()
+    shots = Shots(canvas_rocket, bodies, obstacles, obstacles_collisions)
+    explosions = Explosions(canvas_explosions)
+
+    canvas_stars.border(ord('|'), ord('|'))
+    coroutines.append(get_star_field(canvas_stars, round(options.height * options.width * options.stars)).animate())
+    coroutines.append(shots.animate())
+    coroutines.append(explosions.animate())
+
+    if options.garbage_delay:
+        coroutines.append(spawn_garbage(canvas_garbage, coroutines, explosions, bodies, obstacles, obstacles_collisions,
+                                        options.garbage_delay))
+    else:
+        # garbage flies according to the game scenario
+        coroutines.append(fill_orbit_with_garbage(canvas_garbage, coroutines, explosions, bodies,
+                                                  obstacles, obstacles_collisions, [options.year]))
+
+    if options.bullets_delay:
+        coroutines.append(spawn_bullets(canvas_rocket, shots, options.bullets_delay))
+
+    return canvas_init, canvas, bodies, coroutines
+
+
+def _reset_traced_peak():
+    """Start measuring peak of traced memory from its current size."""
+
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        # there is no reset_peak before python 3.9, clearing traces resets the peak as well,
+        # but freeing memory allocated before the tick does not lower traced size then
+        tracemalloc.clear_traces()
+
+
+def run_ticks(options, trace_allocations=False):
+    """Run world for options.ticks ticks, return list of (tick time, curses calls, allocated blocks) per tick."""
+
+    canvas_init, canvas, bodies, coroutines = create_world(options)
+
+    if trace_allocations:
+        tracemalloc.start()
+
+    ticks = []
+
+    try:
+        for _ in range(options.ticks):
+            calls = sum(canvas_init.stats.values())
+            blocks = sys.getallocatedblocks()
+            if trace_allocations:
+                _reset_traced_peak()
+                memory, _ = tracemalloc.get_traced_memory()
+
+            start = time.perf_counter()
+
+            bodies.step()
+            coroutines.run_tick()
+            canvas.refresh()
+
+            tick_time = time.perf_counter() - start
+
+            if trace_allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                allocated = peak - memory
+            else:
+                allocated = sys.getallocatedblocks() - blocks
+
+            ticks.append((tick_time, sum(canvas_init.stats.values()) - calls, allocated))
+
+    finally:
+        if trace_allocations:
+            tracemalloc.stop()
+
+        coroutines.close()
+
+    return ticks
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(percent / 100 * (len(values) - 1)))]
+
+
+def _summary(values):
+    return {
+        "mean": sum(values) / len(values),
+        "p50": _percentile(values, 50),
+        "p99": _percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def run_benchmark(options):
+
+    ticks = run_ticks(options)
+    tick_times, curses_calls, allocated_blocks = zip(*ticks)
+
+    result = {
+        "label": options.label,
+        "config": {
+            "ticks": options.ticks,
+            "height": options.height,
+            "width": options.width,
+            "stars": options.stars,
+            "garbage_delay": options.garbage_delay,
+            "year": options.year,
+            "bullets_delay": options.bullets_delay,
+            "seed": options.seed,
+        },
+        "ticks_per_second": len(tick_times) / sum(tick_times),
+        "tick_time": _summary(tick_times),
+        "curses_calls_per_tick": _summary(curses_calls),
+        # net growth of allocated memory blocks during tick
+        "allocated_blocks_per_tick": _summary(allocated_blocks),
+    }
+
+    if options.allocations:
+        # the same world once again, tracing slows ticks down, so its timings are not used
+        _, _, allocated_bytes = zip(*run_ticks(options, trace_allocations=True))
+        result["allocated_bytes_per_tick"] = _summary(allocated_bytes)
+
+    return result
+
+
+def _natural_number(number):
+
+    exception = argparse.ArgumentTypeError("Value has to be more than 0.")
+
+    try:
+        number = int(number)
+    except ValueError:
+        raise exception
+
+    if number < 1:
+        raise exception
+
+    return number
+
+
+def _non_negative_number(number):
+
+    exception = argparse.ArgumentTypeError("Value has to be non-negative.")
+
+    try:
+        number = int(number)
+    except ValueError:
+        raise exception
+
+    if number < 0:
+        raise exception
+
+    return number
+
+
+def grab_args():
+    parser = argparse.ArgumentParser(description="Game tick benchmark on headless canvas")
+    parser.add_argument("-n", "--ticks", action="store", type=_natural_number, default=1000,
+                        help="number of ticks to run, default is 1000")
+    parser.add_argument("--height", action="store", type=_natural_number, default=50,
+                        help="canvas height, default is 50")
+    parser.add_argument("--width", action="store", type=_natural_number, default=200,
+                        help="canvas width, default is 200")
+    parser.add_argument("-s", "--stars", action="store", type=float, default=0.04,
+                        help="part of canvas covered by stars, default is 0.04")
+    parser.add_argument("-g", "--garbage-delay", action="store", type=_non_negative_number, default=2,
+                        help="tics between new garbage, 0 means according to year, default is 2")
+    parser.add_argument("-y", "--year", action="store", type=int, default=2020,
+                        help="year for garbage delay if garbage delay is 0, default is 2020")
+    parser.add_argument("-b", "--bullets-delay", action="store", type=_non_negative_number, default=1,
+                        help="tics between shots, 0 means no shots, default is 1")
+    parser.add_argument("-a", "--allocations", action="store_true",
+                        help="run once again with tracemalloc and report allocated bytes per tick")
+    parser.add_argument("--seed", action="store", type=int, default=0,
+                        help="random seed, default is 0")
+    parser.add_argument("-l", "--label", action="store", default="",
+                        help="label of the results, e.g. version")
+    parser.add_argument("-o", "--output", action="store",
+                        help="JSON file for the results, default is console output")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    options = grab_args()
+
+    if not 0 < options.stars <= 0.33:
+        sys.exit("Stars have to cover more than 0 and at most 0.33 of canvas.")
+
+    results = run_benchmark(options)
+
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
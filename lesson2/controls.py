@@ -0,0 +1,81 @@
+import selectors
+import time
+from collections import deque
+
+
+class InputQueue:
+    """Queue of keys pressed with time they were read at.
+
+    Keys are read from canvas as soon as they come while the game waits for the next tick, so
+    input latency does not depend on tick interval. Rocket takes keys as a batch once per tick.
+    """
+
+    def __init__(self, canvas, stream=None, clock=time.monotonic, sleep=time.sleep, recorder=None):
+        self.canvas = canvas
+        # session recorder gets every batch of keys
+        self.recorder = recorder
+        self._clock = clock
+        self._sleep = sleep
+        # (time, key code)
+        self.events = deque()
+        # time between reading the oldest key of the last batch and taking the batch
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+        # without stream, e.g. for headless canvas, keys are read only when the batch is taken
+        self._selector = None
+        if stream is not None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(stream, selectors.EVENT_READ)
+
+    def poll(self):
+        """Read all keys which are available now."""
+
+        while True:
+            pressed_key_code = self.canvas.getch()
+
+            if pressed_key_code == -1:
+                # https://docs.python.org/3/library/curses.html#curses.window.getch
+                break
+
+            self.events.append((self._clock(), pressed_key_code))
+
+    def wait(self, timeout):
+        """Sleep for timeout reading keys as soon as they are pressed, may be used as scheduler's sleep."""
+
+        if self._selector is None:
+            self._sleep(timeout)
+            return
+
+        deadline = self._clock() + timeout
+        remains = timeout
+
+        while remains > 0:
+            if self._selector.select(remains):
+                self.poll()
+
+            remains = deadline - self._clock()
+
+    def take_batch(self):
+        """Return key codes pressed since the last batch in order they were pressed."""
+
+        self.poll()
+
+        if not self.events:
+            return []
+
+        now = self._clock()
+        self.last_latency = now - self.events[0][0]
+        self.max_latency = max(self.max_latency, self.last_latency)
+
+        keys = [key for _, key in self.events]
+        self.events.clear()
+
+        if self.recorder is not None:
+            self.recorder.record(keys)
+
+        return keys
+
+    def close(self):
+        if self._selector is not None:
+            self._selector.close()
@@ -1,3 +1,7 @@
+import curses
+import re
+
+
 SPACE_KEY_CODE = 32
 LEFT_KEY_CODE = 260
 RIGHT_KEY_CODE = 261
@@ -5,35 +9,55 @@ UP_KEY_CODE = 259
 DOWN_KEY_CODE = 258
 
 
-def read_controls(canvas):
-    """Read keys pressed and returns tuple with controls state."""
+def fold_controls(keys):
+    """Fold keys pressed during tick to tuple with controls state: forces directions and number of shots.
 
-    rows_direction = columns_direction = 0
-    space_pressed = False
+    Opposite keys compensate each other, every space press is a separate shot.
+    """
 
-    while True:
-        pressed_key_code = canvas.getch()
+    rows_direction = columns_direction = 0
+    shots = 0
 
-        if pressed_key_code == -1:
-            # https://docs.python.org/3/library/curses.html#curses.window.getch
-            break
+    for pressed_key_code in keys:
 
         if pressed_key_code == UP_KEY_CODE:
-            rows_direction = -1
+            rows_direction -= 1
 
         if pressed_key_code == DOWN_KEY_CODE:
-            rows_direction = 1
+            rows_direction += 1
 
         if pressed_key_code == RIGHT_KEY_CODE:
-            columns_direction = 1
+            columns_direction += 1
 
         if pressed_key_code == LEFT_KEY_CODE:
-            columns_direction = -1
+            columns_direction -= 1
 
         if pressed_key_code == SPACE_KEY_CODE:
-            space_pressed = True
+            shots += 1
+
+    # only direction of force matters
+    rows_direction = (rows_direction > 0) - (rows_direction < 0)
+    columns_direction = (columns_direction > 0) - (columns_direction < 0)
+
+    return rows_direction, columns_direction, shots
+
+
+def beep():
+    """Beep if terminal is initialized, headless canvas makes no sound."""
 
-    return rows_direction, columns_direction, space_pressed
+    try:
+        curses.beep()
+    except curses.error:
+        pass
+
+
+def hide_cursor():
+    """Hide cursor if terminal is initialized and supports it."""
+
+    try:
+        curses.curs_set(False)
+    except curses.error:
+        pass
 
 
 def draw_frame(canvas, start_row, start_column, text, negative=False):
@@ -66,3 +90,59 @@ def get_frame_size(text):
     rows = len(lines)
     columns = max([len(line) for line in lines])
     return rows, columns
+
+
+class Sprite:
+    """Multiline text fragment prepared for drawing once: split rows, size and runs of non-space symbols."""
+
+    __slots__ = ("text", "rows", "height", "width", "runs")
+
+    def __init__(self, text):
+        self.text = text
+        self.rows = text.splitlines()
+        self.height, self.width = get_frame_size(text)
+
+        # spaces are not drawn, so sprite is drawn and erased by runs of visible symbols
+        self.runs = tuple(
+            (row, match.start(), match.group(), " " * len(match.group()))
+            for row, line in enumerate(self.rows)
+            for match in re.finditer(r"\S+", line))
+
+    def blit(self, canvas, start_row, start_column, negative=False, background=None):
+        """Draw sprite on canvas clipped by its borders. Erase sprite instead of drawing if negative=True is specified.
+
+        Spaces are skipped, so what is under the sprite shows through them, unless background symbol is
+        specified: then the whole box of sprite is drawn and spaces are drawn with it.
+        Coordinates have to be int.
+        """
+
+        rows_number, columns_number = canvas.getmaxyx()
+
+        runs = self.runs
+        if background is not None and not negative:
+            runs = (
+                (row, 0, line.ljust(self.width).replace(" ", background), None)
+                for row, line in enumerate(self.rows))
+
+        for row, column, symbols, blank in runs:
+            row += start_row
+
+            if row < 0 or row >= rows_number:
+                continue
+
+            column += start_column
+
+            if column >= columns_number:
+                continue
+
+            text = blank if negative else symbols
+
+            if column < 0:
+                text = text[-column:]
+                column = 0
+
+            if column + len(text) > columns_number:
+                text = text[:columns_number - column]
+
+            if text:
+                canvas.addstr(row, column, text)
@@ -1,7 +1,7 @@
 import asyncio
-import curses
+from array import array
 
-from curses_tools import draw_frame, get_frame_size
+from curses_tools import Sprite, beep
 
 
 EXPLOSION_FRAMES = [
@@ -30,21 +30,84 @@ EXPLOSION_FRAMES = [
     """,
 ]
 
+EXPLOSION_SPRITES = [Sprite(frame) for frame in EXPLOSION_FRAMES]
 
-async def explode(canvas, center_row, center_column):
+# every frame is shown for one tick and erased on the next one
+EXPLOSION_TICS = 2 * len(EXPLOSION_SPRITES)
 
-    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
-    corner_row = center_row - rows // 2
-    corner_column = center_column - columns // 2
 
-    curses.beep()
+class Explosions:
+    """Pool of explosions kept in fixed-capacity arrays instead of coroutine per explosion.
 
-    for frame in EXPLOSION_FRAMES:
+    Explosion is just a corner and a phase counter, every tick step shows or erases the frame of
+    its phase. Slots of finished explosions are reused.
+    """
 
-        draw_frame(canvas, corner_row, corner_column, frame)
+    def __init__(self, canvas, capacity=16):
 
-        await asyncio.sleep(0)
+        assert capacity > 0, AssertionError("Capacity has to be more than 0")
 
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
+        self.canvas = canvas
 
-        await asyncio.sleep(0)
+        self.corner_rows = array("h", [0]) * capacity
+        self.corner_columns = array("h", [0]) * capacity
+        self.phases = bytearray(capacity)
+
+        self._free = list(range(capacity - 1, -1, -1))
+        self._active = []
+
+    def __len__(self):
+        return len(self._active)
+
+    def explode(self, center_row, center_column):
+        """Start explosion, it lasts EXPLOSION_TICS. Return False if there is no free slot."""
+
+        if not self._free:
+            return False
+
+        first_sprite = EXPLOSION_SPRITES[0]
+
+        slot = self._free.pop()
+        self.corner_rows[slot] = round(center_row) - first_sprite.height // 2
+        self.corner_columns[slot] = round(center_column) - first_sprite.width // 2
+        self.phases[slot] = 0
+        self._active.append(slot)
+
+        beep()
+
+        return True
+
+    def step(self):
+        """Show or erase frames of all explosions on one tick. Return number of explosions left."""
+
+        canvas = self.canvas
+        phases = self.phases
+        active = self._active
+        kept = 0
+
+        for slot in active:
+            phase = phases[slot]
+
+            # even phase shows the frame, odd one erases it
+            EXPLOSION_SPRITES[phase // 2].blit(
+                canvas, self.corner_rows[slot], self.corner_columns[slot], negative=phase % 2 == 1)
+
+            phase += 1
+
+            if phase == EXPLOSION_TICS:
+                self._free.append(slot)
+            else:
+                phases[slot] = phase
+                active[kept] = slot
+                kept += 1
+
+        del active[kept:]
+
+        return kept
+
+    async def animate(self):
+
+        while True:
+            self.step()
+
+            await asyncio.sleep(0)
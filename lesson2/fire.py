@@ -1,47 +1,136 @@
 import asyncio
-import curses
+from array import array
 
+from curses_tools import beep
 
-async def fire(canvas, obstacles, obstacles_collisions, start_row, start_column, rows_speed=-0.3, columns_speed=0):
-    """Display animation of gun shot. Direction and speed can be specified."""
 
-    row, column = start_row, start_column
+# symbols of gun shot flash, one per tick
+SHOT_FLASH = '.+*'
 
-    canvas.addstr(round(row), round(column), '.')
-    await asyncio.sleep(0)
+# phase of shot which flies after its flash
+SHOT_FLYING = len(SHOT_FLASH)
 
-    canvas.addstr(round(row), round(column), '+')
-    await asyncio.sleep(0)
 
-    canvas.addstr(round(row), round(column), '*')
-    await asyncio.sleep(0)
+class Shots:
+    """Pool of gun shots kept in fixed-capacity arrays instead of coroutine per shot.
 
-    canvas.addstr(round(row), round(column), ' ')
+    Slots of finished shots are reused, so sustained fire allocates nothing. Every tick step animates
+    flashes, redraws flying shots, which are moved by physics, and registers their collisions.
+    """
 
-    row += rows_speed
-    column += columns_speed
+    def __init__(self, canvas, bodies, obstacles, obstacles_collisions, capacity=64):
 
-    symbol = '-' if columns_speed else '|'
+        assert capacity > 0, AssertionError("Capacity has to be more than 0")
 
-    rows, columns = canvas.getmaxyx()
-    max_row, max_column = rows - 1, columns - 1
+        self.canvas = canvas
+        self.bodies = bodies
+        self.obstacles = obstacles
+        self.obstacles_collisions = obstacles_collisions
 
-    curses.beep()
+        self.rows = array("d", [0]) * capacity
+        self.columns = array("d", [0]) * capacity
+        self.row_speeds = array("d", [0]) * capacity
+        self.column_speeds = array("d", [0]) * capacity
+        self.phases = bytearray(capacity)
+        # -1 means shot has no body yet
+        self.bodies_ids = array("l", [-1]) * capacity
 
-    while 1 < row < max_row and 0 < column < max_column:
+        self._free = list(range(capacity - 1, -1, -1))
+        # slots of shots in the order they were fired
+        self._active = []
 
-        canvas.addstr(round(row), round(column), symbol)
+        rows, columns = canvas.getmaxyx()
+        self._max_row, self._max_column = rows - 1, columns - 1
 
-        await asyncio.sleep(0)
+    def __len__(self):
+        return len(self._active)
+
+    def fire(self, start_row, start_column, rows_speed=-0.3, columns_speed=0):
+        """Start gun shot. Direction and speed can be specified. Return False if there is no free slot."""
+
+        if not self._free:
+            return False
+
+        slot = self._free.pop()
+        self.rows[slot], self.columns[slot] = start_row, start_column
+        self.row_speeds[slot], self.column_speeds[slot] = rows_speed, columns_speed
+        self.phases[slot] = 0
+        self._active.append(slot)
+
+        return True
+
+    def _step_shot(self, slot):
+        """Animate shot on one tick. Return False if shot is over."""
+
+        canvas = self.canvas
+        phase = self.phases[slot]
+        row, column = self.rows[slot], self.columns[slot]
+
+        if phase < SHOT_FLYING:
+            canvas.addstr(round(row), round(column), SHOT_FLASH[phase])
+            self.phases[slot] = phase + 1
+
+            return True
 
         canvas.addstr(round(row), round(column), ' ')
 
-        row += rows_speed
-        column += columns_speed
+        if self.bodies_ids[slot] == -1:
+            row += self.row_speeds[slot]
+            column += self.column_speeds[slot]
+
+            # shot is moved by physics
+            self.bodies_ids[slot] = self.bodies.add(row, column, self.row_speeds[slot], self.column_speeds[slot])
+
+            beep()
+
+        else:
+            row, column = self.bodies.get_location(self.bodies_ids[slot])
+
+            collisions = self.obstacles.get_collisions(row, column)
+
+            if collisions:
+                self.obstacles_collisions.update(collisions)
+
+                return False
+
+        if not (1 < row < self._max_row and 0 < column < self._max_column):
+            return False
+
+        canvas.addstr(round(row), round(column), '-' if self.column_speeds[slot] else '|')
+        self.rows[slot], self.columns[slot] = row, column
+
+        return True
+
+    def _release(self, slot):
+        body = self.bodies_ids[slot]
+
+        if body != -1:
+            self.bodies.remove(body)
+            self.bodies_ids[slot] = -1
+
+        self._free.append(slot)
+
+    def step(self):
+        """Animate all shots on one tick. Return number of shots left."""
+
+        active = self._active
+        kept = 0
+
+        # finished shots are dropped in place, the order of the rest is kept
+        for slot in active:
+            if self._step_shot(slot):
+                active[kept] = slot
+                kept += 1
+            else:
+                self._release(slot)
+
+        del active[kept:]
+
+        return kept
 
-        collisions = set(filter(lambda o: o.has_collision(row, column), obstacles))
+    async def animate(self):
 
-        if collisions:
-            obstacles_collisions.update(collisions)
+        while True:
+            self.step()
 
-            return
+            await asyncio.sleep(0)
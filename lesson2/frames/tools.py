@@ -1,9 +1,54 @@
+import json
+import sys
+from fnmatch import fnmatch
 from glob import iglob
 
+from curses_tools import Sprite
 from exceptions import EmptyFrame
 
 
-def get_frames(path_pattern):
+FRAMES_PATTERN = "frames/**/*.txt"
+FRAMES_BUNDLE = "frames/frames.json"
+
+# frame file path -> frame text, filled from bundle
+_bundle = {}
+# path pattern -> frames or sprites, every pattern is read once per process
+_frames_cache = {}
+_sprites_cache = {}
+
+
+def load_bundle(bundle_path):
+    """Load all frames from the single bundle file, so getting frames does not touch disk."""
+
+    with open(bundle_path, "r") as file:
+        bundle = json.load(file)
+
+    _bundle.clear()
+    _bundle.update(bundle)
+    _frames_cache.clear()
+    _sprites_cache.clear()
+
+
+def pack_bundle(bundle_path, path_pattern=FRAMES_PATTERN):
+    """Pack frames files matched by pattern into the single bundle file."""
+
+    bundle = {}
+
+    for frame_file in sorted(iglob(path_pattern, recursive=True)):
+        with open(frame_file, "r") as file:
+            bundle[frame_file] = file.read()
+
+    with open(bundle_path, "w") as file:
+        json.dump(bundle, file)
+
+    return len(bundle)
+
+
+def _read_frames(path_pattern):
+
+    frame_files = sorted(path for path in _bundle if fnmatch(path, path_pattern))
+    if frame_files:
+        return [_bundle[path] for path in frame_files]
 
     frames = []
 
@@ -11,7 +56,36 @@ def get_frames(path_pattern):
         with open(frame_file, "r") as file:
             frames.append(file.read())
 
+    return frames
+
+
+def get_frames(path_pattern):
+
+    frames = _frames_cache.get(path_pattern)
+    if frames is not None:
+        return frames
+
+    frames = tuple(_read_frames(path_pattern))
+
     if not frames or not all(frames):
         raise EmptyFrame("Frame can not be empty")
 
+    _frames_cache[path_pattern] = frames
+
     return frames
+
+
+def get_sprites(path_pattern):
+
+    sprites = _sprites_cache.get(path_pattern)
+    if sprites is None:
+        sprites = _sprites_cache[path_pattern] = tuple(Sprite(frame) for frame in get_frames(path_pattern))
+
+    return sprites
+
+
+if __name__ == "__main__":
+
+    # python -m frames.tools [bundle path]
+    bundle_path = sys.argv[1] if len(sys.argv) > 1 else FRAMES_BUNDLE
+    print(f"{pack_bundle(bundle_path)} frames were packed to {bundle_path}")
@@ -1,28 +1,28 @@
 import asyncio
 
-from curses_tools import draw_frame, get_frame_size
-from frames.tools import get_frames
+from frames.tools import get_sprites
+from renderer import OPAQUE_BLANK
 
 
-async def show_game_over(canvas, frame):
+GAME_OVER_FRAMES = "frames/gameover/gameover.txt"
 
-    assert bool(frame), AssertionError("Frame can not be empty")
 
-    frame_height, frame_width = get_frame_size(frame)
+async def show_game_over(canvas, sprite):
+
+    assert bool(sprite.runs), AssertionError("Frame can not be empty")
 
     height, width = canvas.getmaxyx()
-    row = height // 2 - frame_height // 2
-    column = width // 2 - frame_width // 2
+    row = height // 2 - sprite.height // 2
+    column = width // 2 - sprite.width // 2
 
-    draw_frame(canvas, row, column, frame)
+    # the frame is drawn once on the top layer, its background hides objects which fly under it
+    sprite.blit(canvas, row, column, background=OPAQUE_BLANK)
 
-    while True:
-        await asyncio.sleep(0)
-        draw_frame(canvas, row, column, frame)
+    await asyncio.sleep(0)
 
 
 def get_game_over(canvas):
 
-    frame = get_frames("frames/gameover/gameover.txt")
+    sprites = get_sprites(GAME_OVER_FRAMES)
 
-    return show_game_over(canvas, frame[0])
+    return show_game_over(canvas, sprites[0])
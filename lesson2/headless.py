@@ -0,0 +1,146 @@
+import asyncio
+import curses
+from array import array
+from collections import Counter, deque
+
+from scheduler import TickScheduler
+
+
+class HeadlessCanvas:
+    """Canvas which replaces curses window without a terminal.
+
+    Screen is kept in a bytearray shared by the canvas and its derived windows, keys pressed are
+    taken from the scripted input queue. Every call is counted in stats, so it can be used for
+    measuring how many curses calls the game makes.
+    """
+
+    def __init__(self, height, width, keys=(), _parent=None, _begin=(0, 0)):
+
+        assert height > 0 and width > 0, AssertionError("Height and width have to be more than 0")
+
+        self.height, self.width = height, width
+        self.begin_row, self.begin_column = _begin
+
+        if _parent is None:
+            self.screen_width = width
+            self.screen = bytearray(b" " * (height * width))
+            self.attrs = array("L", [0]) * (height * width)
+            self.input = deque(keys)
+            self.stats = Counter()
+
+        else:
+            self.screen_width = _parent.screen_width
+            self.screen = _parent.screen
+            self.attrs = _parent.attrs
+            self.input = _parent.input
+            self.stats = _parent.stats
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def derwin(self, *args):
+        """Create derived window, args are (nlines, ncols, begin_y, begin_x) or (begin_y, begin_x)."""
+
+        self.stats["derwin"] += 1
+
+        if len(args) == 2:
+            begin_row, begin_column = args
+            rows, columns = self.height - begin_row, self.width - begin_column
+
+        else:
+            rows, columns, begin_row, begin_column = args
+            rows = rows or self.height - begin_row
+            columns = columns or self.width - begin_column
+
+        if (begin_row < 0 or begin_column < 0
+                or begin_row + rows > self.height or begin_column + columns > self.width):
+            raise curses.error("derwin() returned ERR")
+
+        return HeadlessCanvas(rows, columns, _parent=self,
+                              _begin=(self.begin_row + begin_row, self.begin_column + begin_column))
+
+    def _put(self, row, column, symbol, attr):
+        if isinstance(symbol, int):
+            code = symbol & 0xFF
+        else:
+            code = ord(symbol)
+            if code > 0xFF:
+                code = ord("?")
+
+        index = (self.begin_row + row) * self.screen_width + self.begin_column + column
+        self.screen[index] = code
+        self.attrs[index] = attr
+
+    def _write(self, row, column, symbols, attr):
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise curses.error("addwstr() returned ERR")
+
+        for symbol in symbols:
+            self._put(row, column, symbol, attr)
+
+            column += 1
+            if column == self.width:
+                row, column = row + 1, 0
+
+            # like curses, cursor can not be moved out of the window
+            if row == self.height:
+                raise curses.error("addwstr() returned ERR")
+
+    def addch(self, row, column, symbol, attr=0):
+        self.stats["addch"] += 1
+        self._write(row, column, (symbol, ), attr)
+
+    def addstr(self, row, column, text, attr=0):
+        self.stats["addstr"] += 1
+        self._write(row, column, text, attr)
+
+    def border(self, left=0, right=0, top=0, bottom=0,
+               top_left=0, top_right=0, bottom_left=0, bottom_right=0):
+        self.stats["border"] += 1
+
+        last_row, last_column = self.height - 1, self.width - 1
+
+        for column in range(1, last_column):
+            self._put(0, column, top or "-", 0)
+            self._put(last_row, column, bottom or "-", 0)
+
+        for row in range(1, last_row):
+            self._put(row, 0, left or "|", 0)
+            self._put(row, last_column, right or "|", 0)
+
+        for row, column, symbol in ((0, 0, top_left), (0, last_column, top_right),
+                                    (last_row, 0, bottom_left), (last_row, last_column, bottom_right)):
+            self._put(row, column, symbol or "+", 0)
+
+    def getch(self):
+        self.stats["getch"] += 1
+        return self.input.popleft() if self.input else -1
+
+    def push_keys(self, *keys):
+        """Add keys to the input queue, they are returned by getch in the same order."""
+        self.input.extend(keys)
+
+    def refresh(self):
+        self.stats["refresh"] += 1
+
+    def keypad(self, flag):
+        pass
+
+    def nodelay(self, flag):
+        pass
+
+    def get_lines(self):
+        """Return text of the window by lines."""
+
+        start = self.begin_row * self.screen_width + self.begin_column
+
+        return [
+            self.screen[offset:offset + self.width].decode("latin-1")
+            for offset in range(start, start + self.height * self.screen_width, self.screen_width)]
+
+
+def create_headless_scheduler(ticks, tic=0.1):
+    """Create scheduler which runs given number of ticks as fast as possible, rendering every one of them."""
+
+    return TickScheduler(tic, max_frame_skip=0, sleep=lambda _: None, max_ticks=ticks,
+                         async_sleep=lambda _: asyncio.sleep(0))
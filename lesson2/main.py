@@ -1,36 +1,75 @@
+import argparse
+import asyncio
 import curses
+import json
+import os.path
+import random
 import sys
-import time
+from contextlib import nullcontext
+from os import getenv
 
-from fire import fire
-from obstacles import show_obstacles
+from controls import InputQueue
+from curses_tools import hide_cursor
+from explosion import Explosions
+from fire import Shots
+from frames.tools import FRAMES_BUNDLE, get_sprites, load_bundle
+from gameover import GAME_OVER_FRAMES
+from obstacles import ObstaclesGrid, show_obstacles
+from physics import Bodies
+from profiler import Profiler
+from recorder import Recorder
+from renderer import EXPLOSIONS_LAYER, GARBAGE_LAYER, HUD_LAYER, ROCKET_LAYER, STARS_LAYER, Compositor, FrameBuffer
 from rocket import get_rocket_handlers
+from scheduler import RunQueue, TickScheduler
 from space_garbage import fill_orbit_with_garbage
-from stars import get_stars
+from stars import get_star_field
 from years import show_years, years_increment
 
 
-def play_the_game(canvas_init, tic, print_obstacles=False):
+def create_game(canvas_init, controls_stream=None, print_obstacles=False, profiler=None, recorder=None):
+    """Create canvases and run queue filled with game coroutines.
 
-    assert tic > 0, AssertionError("Tic interval has to be more that 0")
+    Return (canvas, canvas_year, controls, bodies, coroutines).
+    """
 
     border = ord('|')
 
     # set main canvas
     height_init, width_init = canvas_init.getmaxyx()
-    canvas = canvas_init.derwin(height_init - 2, width_init, 0, 0)
+    # objects draw to frame buffers, changes go to the screen on render
+    canvas = Compositor(canvas_init.derwin(height_init - 2, width_init, 0, 0))
     height, width = canvas.getmaxyx()
 
+    # every kind of objects draws on its own layer
+    canvas_stars = canvas.get_layer(STARS_LAYER)
+    canvas_garbage = canvas.get_layer(GARBAGE_LAYER)
+    canvas_explosions = canvas.get_layer(EXPLOSIONS_LAYER)
+    canvas_rocket = canvas.get_layer(ROCKET_LAYER)
+    canvas_hud = canvas.get_layer(HUD_LAYER)
+
     # set years canvas
-    canvas_year = canvas_init.derwin(height_init - 1, 0)
+    canvas_year = FrameBuffer(canvas_init.derwin(height_init - 1, 0))
+
+    # read frames once before the game starts, game over frame is needed only when rocket crashes
+    if os.path.exists(FRAMES_BUNDLE):
+        load_bundle(FRAMES_BUNDLE)
+    get_sprites(GAME_OVER_FRAMES)
 
     # number of starts covers 4% of canvas square
     num_stars = round(height * width * 0.04)
 
-    coroutines = []
+    coroutines = RunQueue(profiler=profiler)
     # obstacles
-    obstacles = set()
+    obstacles = ObstaclesGrid()
     obstacles_collisions = set()
+    # moving bodies
+    bodies = Bodies()
+    # pools of shots and explosions animated by one coroutine each
+    shots = Shots(canvas_rocket, bodies, obstacles, obstacles_collisions)
+    explosions = Explosions(canvas_explosions)
+
+    controls = InputQueue(canvas, controls_stream, recorder=recorder)
+
     years = [1957]
 
     # fill coroutines
@@ -38,38 +77,204 @@ def play_the_game(canvas_init, tic, print_obstacles=False):
     coroutines.append(years_increment(years))
     coroutines.append(show_years(canvas_year, years))
     # stars
-    coroutines.extend(list(get_stars(canvas, num_stars)))
+    coroutines.append(get_star_field(canvas_stars, num_stars).animate())
+    # shots and explosions
+    coroutines.append(shots.animate())
+    coroutines.append(explosions.animate())
     # rocket
-    coroutines.extend(get_rocket_handlers(canvas, coroutines, obstacles, obstacles_collisions, years, 1))
+    coroutines.extend(get_rocket_handlers(canvas_rocket, controls, coroutines, shots, explosions, bodies, obstacles, obstacles_collisions, years, 1, canvas_hud))
     # garbage handler
-    coroutines.append(fill_orbit_with_garbage(canvas, coroutines, obstacles, obstacles_collisions, years))
+    coroutines.append(fill_orbit_with_garbage(canvas_garbage, coroutines, explosions, bodies, obstacles, obstacles_collisions, years))
     # print garbage borders
     if print_obstacles:
-        coroutines.append(show_obstacles(canvas, obstacles))
+        coroutines.append(show_obstacles(canvas_hud, obstacles))
     # explosion
-    coroutines.append(fire(canvas, obstacles, obstacles_collisions, height // 2, width // 2))
+    shots.fire(height // 2, width // 2)
 
     # canvas stuff
     canvas.keypad(True)
-    canvas.border(border, border)
-    curses.curs_set(False)
+    # border is drawn once on the lowest layer, objects never damage it
+    canvas_stars.border(border, border)
+    hide_cursor()
     canvas.nodelay(True)
 
+    return canvas, canvas_year, controls, bodies, coroutines
+
+
+def get_game_report(scheduler, controls):
+    """Return scheduler report with time keys waited for the rocket: of the last batch and the longest one."""
+
+    report = scheduler.report()
+    report["last_input_latency"] = controls.last_latency
+    report["max_input_latency"] = controls.max_latency
+
+    return report
+
+
+def play_the_game(canvas_init, tic, print_obstacles=False, scheduler=None, profiler=None,
+                  recorder=None, replay=None, report=None):
+    """Play the game, keys may be recorded by recorder or fed to headless canvas by replay.
+
+    Return scheduler report with input latency, it is also put to report dict if it is given, so it is kept
+    when the game is stopped by CTRL+C.
+    """
+
+    assert tic > 0, AssertionError("Tic interval has to be more that 0")
+
+    controls_stream = sys.stdin if scheduler is None else None
+    canvas, canvas_year, controls, bodies, coroutines = create_game(
+        canvas_init, controls_stream, print_obstacles, profiler, recorder)
+
+    if scheduler is None:
+        # keys are read while waiting for the next tick
+        scheduler = TickScheduler(tic, sleep=controls.wait)
+
+    # parts of tick are measured only with profiler
+    measure = profiler.measure if profiler is not None else lambda tag: nullcontext()
+
+    def update():
+        if recorder is not None:
+            recorder.step()
+        if replay is not None:
+            replay.step(canvas_init)
+
+        with measure("update"):
+            # all bodies are moved before coroutines draw them
+            with measure("physics"):
+                bodies.step()
+
+            with measure("coroutines"):
+                return coroutines.run_tick()
+
+    def render():
+        # frame buffers write changes to curses windows
+        with measure("render"):
+            canvas.flush()
+            canvas_year.flush()
+
+        # curses updates the terminal
+        with measure("refresh"):
+            canvas.canvas.refresh()
+            canvas_year.canvas.refresh()
+
     # loop
-    while coroutines:
+    try:
+        scheduler.run(update, render)
+    finally:
+        controls.close()
+
+        game_report = get_game_report(scheduler, controls)
+        if report is not None:
+            report.update(game_report)
+
+    return game_report
+
+
+def record_the_game(canvas_init, tic, path, seed, print_obstacles=False, profiler=None, report=None):
+    """Play the game with seeded random and record keys of every tick to the file, see replay.py."""
+
+    random.seed(seed)
+    height, width = canvas_init.getmaxyx()
+
+    with Recorder(path, height, width, seed, tic) as recorder:
+        return play_the_game(canvas_init, tic, print_obstacles, profiler=profiler, recorder=recorder, report=report)
+
+
+async def play_the_game_async(canvas_init, tic, print_obstacles=False, scheduler=None, report=None):
+    """Play the game on the running asyncio loop, so it may share process with other services.
 
-        for i, coroutine in enumerate(coroutines):
+    Every game coroutine runs as asyncio task, keys are read by the loop reader callback.
+    Scheduler report with input latency is returned and put to report dict the same way as play_the_game does.
+    """
 
-            try:
-                coroutine.send(None)
+    assert tic > 0, AssertionError("Tic interval has to be more that 0")
+
+    canvas, canvas_year, controls, bodies, coroutines = create_game(canvas_init, None, print_obstacles)
+    loop = asyncio.get_running_loop()
 
-            except StopIteration:
-                coroutines.pop(i)
+    # headless scheduler comes with its own input
+    read_stdin = scheduler is None
+    if read_stdin:
+        scheduler = TickScheduler(tic)
+        loop.add_reader(sys.stdin, controls.poll)
 
+    def render():
         canvas.refresh()
         canvas_year.refresh()
 
-        time.sleep(tic)
+    try:
+        await scheduler.run_async(coroutines, bodies.step, render)
+    finally:
+        if read_stdin:
+            loop.remove_reader(sys.stdin)
+        controls.close()
+
+        game_report = get_game_report(scheduler, controls)
+        if report is not None:
+            report.update(game_report)
+
+    return game_report
+
+
+def _positive_number(number):
+
+    exception = argparse.ArgumentTypeError("Value has to be more than 0.")
+
+    try:
+        number = float(number)
+    except ValueError:
+        raise exception
+
+    if number <= 0:
+        raise exception
+
+    return number
+
+
+def _seed(number):
+
+    exception = argparse.ArgumentTypeError("Seed has to be non-negative number less than 2 ** 64.")
+
+    try:
+        number = int(number)
+    except ValueError:
+        raise exception
+
+    if not 0 <= number < 2 ** 64:
+        raise exception
+
+    return number
+
+
+def grab_args():
+    parser = argparse.ArgumentParser(description="Space game in terminal")
+
+    parser.add_argument("-t", "--tic", action="store", type=_positive_number,
+                        help="tic interval in seconds, default is 0.1",
+                        default=float(getenv("GAME_TIC", 0.1)))
+
+    parser.add_argument("-a", "--asyncio", action="store_true",
+                        help="run game coroutines as tasks on asyncio loop",
+                        default=bool(getenv("GAME_ASYNCIO", "")))
+
+    parser.add_argument("-o", "--obstacles", action="store_true",
+                        help="show borders of obstacles",
+                        default=bool(getenv("GAME_OBSTACLES", "")))
+
+    parser.add_argument("-p", "--profile", action="store",
+                        help="file for time of game parts as folded stacks for flame graph, default is no profiling. "
+                             "Asyncio mode is not profiled",
+                        default=getenv("GAME_PROFILE", None))
+
+    parser.add_argument("-r", "--record", action="store",
+                        help="file for recording game session, see replay.py. Asyncio mode is not recorded",
+                        default=getenv("GAME_RECORD", None))
+
+    parser.add_argument("-s", "--seed", action="store", type=_seed,
+                        help="random seed of recorded session, default is a random one",
+                        default=getenv("GAME_SEED", None))
+
+    return parser.parse_args()
 
 
 if __name__ == '__main__':
@@ -77,9 +282,22 @@ if __name__ == '__main__':
     exit_msg = ""
     exit_code = 0
 
+    options = grab_args()
+    profiler = Profiler() if options.profile and not options.asyncio else None
+    # overruns and skipped renders of the game, printed on exit
+    report = {}
+
     try:
         curses.update_lines_cols()
-        curses.wrapper(play_the_game, 0.1)
+
+        if options.asyncio:
+            curses.wrapper(lambda canvas: asyncio.run(
+                play_the_game_async(canvas, options.tic, options.obstacles, report=report)))
+        elif options.record:
+            seed = options.seed if options.seed is not None else random.randrange(2 ** 64)
+            curses.wrapper(record_the_game, options.tic, options.record, seed, options.obstacles, profiler, report)
+        else:
+            curses.wrapper(play_the_game, options.tic, options.obstacles, profiler=profiler, report=report)
 
     except KeyboardInterrupt:
         exit_msg = "CTRL+C pressed, exiting..."
@@ -91,6 +309,12 @@ if __name__ == '__main__':
 
     finally:
 
+        if profiler is not None:
+            profiler.dump(options.profile)
+
+        if report:
+            print(json.dumps(report))
+
         if exit_msg:
 
             output = sys.stderr if exit_code else sys.stdout
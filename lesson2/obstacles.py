@@ -1,21 +1,36 @@
 import asyncio
-from uuid import uuid4
+from array import array
+from collections import defaultdict
+from itertools import count
 
 from curses_tools import draw_frame
 
 
+_uids = count(1)
+
+
 class Obstacle:
 
+    __slots__ = ("row", "column", "rows_size", "columns_size", "uid", "slot", "_grid")
+
     def __init__(self, row, column, rows_size=1, columns_size=1, uid=None):
         self.row = row
         self.column = column
         self.rows_size = rows_size
         self.columns_size = columns_size
-        self._uuid = uuid4()
-        self.uid = uid or self._uuid
+        self.uid = uid or next(_uids)
+        # index in ObstacleTable
+        self.slot = None
+        self._grid = None
+
+    def move_to(self, row, column):
+        """Change obstacle position and keep it up to date in the grid obstacle belongs to."""
 
-    def __hash__(self):
-        return hash(self._uuid)
+        self.row = row
+        self.column = column
+
+        if self._grid is not None:
+            self._grid.update(self)
 
     def get_bounding_box_frame(self):
         # increment box size to compensate obstacle movement
@@ -31,12 +46,189 @@ class Obstacle:
 
     def has_collision(self, obj_corner_row, obj_corner_column, obj_size_rows=1, obj_size_columns=1):
         '''Determine if collision has occurred. Return True or False.'''
-        return has_collision(
-            (self.row, self.column),
-            (self.rows_size, self.columns_size),
-            (obj_corner_row, obj_corner_column),
-            (obj_size_rows, obj_size_columns),
-        )
+        return (
+            self.row < obj_corner_row + obj_size_rows and obj_corner_row < self.row + self.rows_size
+            and self.column < obj_corner_column + obj_size_columns
+            and obj_corner_column < self.column + self.columns_size)
+
+
+class ObstacleTable:
+    """Struct of arrays store of obstacles coordinates.
+
+    Coordinates are kept in flat arrays indexed by obstacle slot, slots of removed obstacles are
+    reused, so moving obstacles changes arrays in place and collision checks run over them.
+    """
+
+    def __init__(self):
+        self.rows = array("d")
+        self.columns = array("d")
+        self.rows_sizes = array("d")
+        self.columns_sizes = array("d")
+        # slot -> obstacle, None for free slot
+        self.obstacles = []
+        self._free_slots = []
+
+    def __len__(self):
+        return len(self.obstacles) - len(self._free_slots)
+
+    def __iter__(self):
+        return (o for o in self.obstacles if o is not None)
+
+    def add(self, obstacle):
+        """Put obstacle to a free slot, return the slot."""
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self.obstacles[slot] = obstacle
+            self.rows[slot] = obstacle.row
+            self.columns[slot] = obstacle.column
+            self.rows_sizes[slot] = obstacle.rows_size
+            self.columns_sizes[slot] = obstacle.columns_size
+
+        else:
+            slot = len(self.obstacles)
+            self.obstacles.append(obstacle)
+            self.rows.append(obstacle.row)
+            self.columns.append(obstacle.column)
+            self.rows_sizes.append(obstacle.rows_size)
+            self.columns_sizes.append(obstacle.columns_size)
+
+        obstacle.slot = slot
+
+        return slot
+
+    def remove(self, slot):
+        obstacle = self.obstacles[slot]
+        obstacle.slot = None
+
+        self.obstacles[slot] = None
+        # free slot never collides
+        self.rows_sizes[slot] = self.columns_sizes[slot] = 0
+        self._free_slots.append(slot)
+
+    def move(self, slot, row, column):
+        self.rows[slot] = row
+        self.columns[slot] = column
+
+    def find_collisions(self, slots, obj_corner_row, obj_corner_column, obj_size_rows=1, obj_size_columns=1):
+        """Return set of obstacles from slots which collide with the object."""
+
+        rows, columns = self.rows, self.columns
+        rows_sizes, columns_sizes = self.rows_sizes, self.columns_sizes
+        obj_last_row = obj_corner_row + obj_size_rows
+        obj_last_column = obj_corner_column + obj_size_columns
+
+        return {
+            self.obstacles[i] for i in slots
+            if rows[i] < obj_last_row and obj_corner_row < rows[i] + rows_sizes[i]
+            and columns[i] < obj_last_column and obj_corner_column < columns[i] + columns_sizes[i]}
+
+
+class ObstaclesGrid:
+    """Uniform grid spatial index of obstacles.
+
+    Every obstacle is put to all cells its rectangle covers, so collision lookup checks only
+    obstacles from cells around the object instead of all of them. Obstacles coordinates are
+    kept in ObstacleTable and cells hold table slots.
+    """
+
+    def __init__(self, cell_size=8):
+
+        assert cell_size > 0, AssertionError("Cell size has to be more than 0")
+
+        self.cell_size = cell_size
+        self.table = ObstacleTable()
+        self._cells = defaultdict(set)
+        # slot -> cells bounds obstacle is placed to
+        self._bounds = {}
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, obstacle):
+        return obstacle.slot is not None and obstacle._grid is self
+
+    def _get_bounds(self, row, column, rows_size, columns_size):
+        cell_size = self.cell_size
+        return (
+            int(row // cell_size),
+            int(column // cell_size),
+            int((row + rows_size) // cell_size),
+            int((column + columns_size) // cell_size))
+
+    def _iter_cells(self, bounds):
+        first_row, first_column, last_row, last_column = bounds
+
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                yield cell_row, cell_column
+
+    def _place(self, slot, bounds):
+        self._bounds[slot] = bounds
+
+        for cell in self._iter_cells(bounds):
+            self._cells[cell].add(slot)
+
+    def _remove(self, slot, bounds):
+        cells = self._cells
+
+        for cell in self._iter_cells(bounds):
+            cell_slots = cells[cell]
+            cell_slots.discard(slot)
+
+            if not cell_slots:
+                del cells[cell]
+
+    def add(self, obstacle):
+        if obstacle in self:
+            return
+
+        obstacle._grid = self
+        slot = self.table.add(obstacle)
+        self._place(slot, self._get_bounds(
+            obstacle.row, obstacle.column, obstacle.rows_size, obstacle.columns_size))
+
+    def discard(self, obstacle):
+        if obstacle not in self:
+            return
+
+        slot = obstacle.slot
+        obstacle._grid = None
+        self._remove(slot, self._bounds.pop(slot))
+        self.table.remove(slot)
+
+    def update(self, obstacle):
+        """Move obstacle to the cells of its current position."""
+
+        slot = obstacle.slot
+        self.table.move(slot, obstacle.row, obstacle.column)
+
+        bounds = self._get_bounds(
+            obstacle.row, obstacle.column, obstacle.rows_size, obstacle.columns_size)
+        old_bounds = self._bounds[slot]
+
+        # most of moves happen inside the same cells
+        if bounds == old_bounds:
+            return
+
+        self._remove(slot, old_bounds)
+        self._place(slot, bounds)
+
+    def get_collisions(self, row, column, rows_size=1, columns_size=1):
+        """Return set of obstacles which collide with the object."""
+
+        cells = self._cells
+        candidates = set()
+
+        for cell in self._iter_cells(self._get_bounds(row, column, rows_size, columns_size)):
+            cell_slots = cells.get(cell)
+            if cell_slots:
+                candidates.update(cell_slots)
+
+        return self.table.find_collisions(candidates, row, column, rows_size, columns_size)
 
 
 def _get_bounding_box_lines(rows, columns):
@@ -63,33 +255,3 @@ async def show_obstacles(canvas, obstacles):
 
         for row, column, frame in boxes:
             draw_frame(canvas, row, column, frame, negative=True)
-
-
-def _is_point_inside(corner_row, corner_column, size_rows, size_columns, point_row, point_row_column):
-    rows_flag = corner_row <= point_row < corner_row + size_rows
-    columns_flag = corner_column <= point_row_column < corner_column + size_columns
-
-    return rows_flag and columns_flag
-
-
-def has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
-    '''Determine if collision has occurred. Return True or False.'''
-
-    opposite_obstacle_corner = (
-        obstacle_corner[0] + obstacle_size[0] - 1,
-        obstacle_corner[1] + obstacle_size[1] - 1,
-    )
-
-    opposite_obj_corner = (
-        obj_corner[0] + obj_size[0] - 1,
-        obj_corner[1] + obj_size[1] - 1,
-    )
-
-    return any([
-        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-        _is_point_inside(*obstacle_corner, *obstacle_size,
-                         *opposite_obj_corner),
-
-        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-    ])
@@ -1,4 +1,5 @@
 import math
+from array import array
 
 
 def _limit(value, min_value, max_value):
@@ -77,3 +78,193 @@ def update_speed(row_speed, column_speed, rows_direction, columns_direction, row
             column_speed, column_speed_limit, columns_direction > 0)
 
     return row_speed, column_speed
+
+
+class PhysicsModel:
+    """Speed update of update_speed configured once with limits and fading.
+
+    Acceleration curve is precomputed to the table by speed fraction, so updating speed needs
+    no trigonometry and arguments are validated only once, on creation.
+    """
+
+    def __init__(self, row_speed_limit=2, column_speed_limit=2, fading=0.8, table_size=1024):
+
+        if fading < 0 or fading > 1:
+            raise ValueError(
+                f'Wrong fading value {fading}. Expects float between 0 and 1.')
+
+        if not row_speed_limit or not column_speed_limit:
+            raise ValueError('Speed limits can not be 0.')
+
+        if table_size < 2:
+            raise ValueError(f'Wrong table size {table_size}. Expects at least 2.')
+
+        self.row_speed_limit = abs(row_speed_limit)
+        self.column_speed_limit = abs(column_speed_limit)
+        self.fading = fading
+
+        # speed fraction from -1 to 1 -> speed delta, index of speed is speed * scale + offset
+        offset = (table_size - 1) / 2
+        self._deltas = [math.cos(i / offset - 1) * 0.75 for i in range(table_size)]
+        # 0.5 makes int() round to the nearest index
+        self._offset = offset + 0.5
+        self._row_scale = offset / self.row_speed_limit
+        self._column_scale = offset / self.column_speed_limit
+
+    def _accelerate(self, speed, speed_limit, scale, forward):
+        """The same as _apply_acceleration, but takes delta from the table."""
+
+        # faded speed never exceeds its limit, so index is always in the table
+        delta = self._deltas[int(speed * scale + self._offset)]
+
+        if forward:
+            speed += delta
+            if speed > speed_limit:
+                speed = speed_limit
+        else:
+            speed -= delta
+            if speed < -speed_limit:
+                speed = -speed_limit
+
+        # если скорость близка к нулю, то останавливаем корабль
+        if -0.1 < speed < 0.1:
+            return 0
+
+        return speed
+
+    def update_speed(self, row_speed, column_speed, rows_direction, columns_direction):
+        """Update speed like update_speed does, but without arguments validation."""
+
+        # гасим скорость, чтобы корабль останавливался со временем
+        row_speed *= self.fading
+        column_speed *= self.fading
+
+        if rows_direction:
+            row_speed = self._accelerate(row_speed, self.row_speed_limit, self._row_scale, rows_direction > 0)
+
+        if columns_direction:
+            column_speed = self._accelerate(
+                column_speed, self.column_speed_limit, self._column_scale, columns_direction > 0)
+
+        return row_speed, column_speed
+
+    def step_many(self, row_speeds, column_speeds, rows_directions, columns_directions, indexes):
+        """Update speeds in place for items of arrays given by indexes."""
+
+        update_speed = self.update_speed
+
+        for i in indexes:
+            row_speeds[i], column_speeds[i] = update_speed(
+                row_speeds[i], column_speeds[i], rows_directions[i], columns_directions[i])
+
+
+class Bodies:
+    """Positions and speeds of all moving bodies: rocket, garbage and shots.
+
+    Bodies are kept in arrays indexed by body id, ids of removed bodies are reused. All bodies are
+    moved at once every tick: controlled ones get their speed updated by force directions, bounded
+    ones are kept in their borders.
+    """
+
+    def __init__(self, model=None):
+        # the same model for all controlled bodies
+        self.model = model or PhysicsModel()
+
+        self.rows = array("d")
+        self.columns = array("d")
+        self.row_speeds = array("d")
+        self.column_speeds = array("d")
+        self.rows_directions = array("b")
+        self.columns_directions = array("b")
+
+        self._bodies = set()
+        self._free_ids = []
+        # controlled bodies ids
+        self._controlled = set()
+        # body id -> (min row, max row, min column, max column)
+        self._bounds = {}
+        # bodies which moved to other cell on the last step
+        self.moved = set()
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def __contains__(self, body):
+        return body in self._bodies
+
+    def add(self, row, column, row_speed=0, column_speed=0, controlled=False):
+        """Add body, return its id."""
+
+        if self._free_ids:
+            body = self._free_ids.pop()
+            self.rows[body], self.columns[body] = row, column
+            self.row_speeds[body], self.column_speeds[body] = row_speed, column_speed
+            self.rows_directions[body] = self.columns_directions[body] = 0
+
+        else:
+            body = len(self.rows)
+            self.rows.append(row)
+            self.columns.append(column)
+            self.row_speeds.append(row_speed)
+            self.column_speeds.append(column_speed)
+            self.rows_directions.append(0)
+            self.columns_directions.append(0)
+
+        self._bodies.add(body)
+        if controlled:
+            self._controlled.add(body)
+
+        return body
+
+    def remove(self, body):
+        self._bodies.remove(body)
+        self._controlled.discard(body)
+        self._bounds.pop(body, None)
+        self.moved.discard(body)
+        self._free_ids.append(body)
+
+    def get_location(self, body):
+        return self.rows[body], self.columns[body]
+
+    def set_directions(self, body, rows_direction, columns_direction):
+        """Set force directions for controlled body, see update_speed for values."""
+
+        self.rows_directions[body] = rows_direction
+        self.columns_directions[body] = columns_direction
+
+    def set_bounds(self, body, min_row, max_row, min_column, max_column):
+        """Keep body location in borders."""
+        self._bounds[body] = (min_row, max_row, min_column, max_column)
+
+    def step(self):
+        """Move all bodies on one tick. Return set of bodies which moved to other cell."""
+
+        rows, columns = self.rows, self.columns
+        row_speeds, column_speeds = self.row_speeds, self.column_speeds
+        bounds = self._bounds
+        moved = self.moved
+        moved.clear()
+
+        self.model.step_many(row_speeds, column_speeds, self.rows_directions, self.columns_directions,
+                             self._controlled)
+
+        for body in self._bodies:
+            row_speed, column_speed = row_speeds[body], column_speeds[body]
+
+            if not row_speed and not column_speed and body not in bounds:
+                continue
+
+            old_row, old_column = rows[body], columns[body]
+            row, column = old_row + row_speed, old_column + column_speed
+
+            if body in bounds:
+                min_row, max_row, min_column, max_column = bounds[body]
+                row = _limit(row, min_row, max_row)
+                column = _limit(column, min_column, max_column)
+
+            rows[body], columns[body] = row, column
+
+            if round(row) != round(old_row) or round(column) != round(old_column):
+                moved.add(body)
+
+        return moved
@@ -0,0 +1,81 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def get_tag(coroutine):
+    """Return tag of coroutine by its origin, e.g. fly_garbage or StarField.animate."""
+    return getattr(coroutine, "__qualname__", type(coroutine).__name__)
+
+
+class Profiler:
+    """Cumulative time and number of calls of the game parts by their stacks.
+
+    Parts are measured inside each other, so e.g. coroutines are kept under update;coroutines;<tag>.
+    Results are dumped as folded stacks, which flame graph tools read, e.g. flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, root="game", clock=time.perf_counter):
+        self.root = root
+        self._clock = clock
+        self._stack = (root, )
+        # stack of tags -> [number of calls, seconds]
+        self.stats = defaultdict(lambda: [0, 0.0])
+
+    @contextmanager
+    def measure(self, tag):
+        """Measure time of the block under tag, nested measures go under it."""
+
+        stack = self._stack
+        self._stack = stack + (tag, )
+        start = self._clock()
+
+        try:
+            yield
+
+        finally:
+            record = self.stats[self._stack]
+            record[0] += 1
+            record[1] += self._clock() - start
+            self._stack = stack
+
+    def resume(self, coroutine):
+        """Resume coroutine, measure it under its tag. Return what coroutine yields."""
+
+        start = self._clock()
+
+        try:
+            return coroutine.send(None)
+
+        finally:
+            record = self.stats[self._stack + (get_tag(coroutine), )]
+            record[0] += 1
+            record[1] += self._clock() - start
+
+    def report(self):
+        """Return dict of stacks joined by `;` -> {"count": number of calls, "seconds": cumulative time}."""
+
+        return {
+            ";".join(stack): {"count": count, "seconds": seconds}
+            for stack, (count, seconds) in sorted(self.stats.items())}
+
+    def get_folded(self):
+        """Return lines of folded stacks with own time in microseconds, time of nested parts is excluded."""
+
+        own_times = {stack: seconds for stack, (_, seconds) in self.stats.items()}
+
+        for stack, (_, seconds) in self.stats.items():
+            parent = stack[:-1]
+            if parent in own_times:
+                own_times[parent] -= seconds
+
+        return [
+            "{} {}".format(";".join(stack), round(seconds * 1e6))
+            for stack, seconds in sorted(own_times.items()) if round(seconds * 1e6) > 0]
+
+    def dump(self, path):
+        """Write folded stacks to the file."""
+
+        with open(path, "w") as file:
+            for line in self.get_folded():
+                print(line, file=file)
@@ -0,0 +1,112 @@
+import struct
+from array import array
+from collections import defaultdict
+
+
+# magic, version, screen height, screen width, random seed, tic interval
+HEADER = struct.Struct("<4sBHHQd")
+MAGIC = b"SGRP"
+VERSION = 1
+
+# tick, number of key codes which follow the record, 0 marks the last tick of session
+RECORD = struct.Struct("<IB")
+# key codes are written as an array of unsigned shorts
+KEYS_TYPECODE = "H"
+MAX_RECORD_KEYS = 255
+
+
+class Recorder:
+    """Writer of game session: random seed, screen size and keys taken on every tick.
+
+    Only ticks with keys are written, so session of thousands of ticks takes a few bytes per key.
+    """
+
+    def __init__(self, path, height, width, seed, tic):
+        self.tick = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, height, width, seed, tic))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def step(self):
+        """Move to the next tick, it is called once per tick before anything takes keys."""
+        self.tick += 1
+
+    def record(self, keys):
+        """Write keys taken on the current tick."""
+
+        for start in range(0, len(keys), MAX_RECORD_KEYS):
+            chunk = array(KEYS_TYPECODE, keys[start:start + MAX_RECORD_KEYS])
+            self._file.write(RECORD.pack(self.tick, len(chunk)))
+            self._file.write(chunk.tobytes())
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self._file.write(RECORD.pack(self.tick, 0))
+        self._file.close()
+
+
+class Replay:
+    """Recorded game session. Every tick step feeds keys of the tick to the headless canvas."""
+
+    def __init__(self, height, width, seed, tic, ticks, keys):
+        self.height, self.width = height, width
+        self.seed = seed
+        self.tic = tic
+        # number of recorded ticks
+        self.ticks = ticks
+        # tick -> key codes
+        self.keys = keys
+        self.tick = 0
+
+    def step(self, canvas):
+        """Move to the next tick and push its keys to the canvas input."""
+
+        self.tick += 1
+        keys = self.keys.get(self.tick)
+
+        if keys:
+            canvas.push_keys(*keys)
+
+
+def read_replay(path):
+    """Read game session written by Recorder."""
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError("File {} is not a game session, it is too short".format(path))
+
+    magic, version, height, width, seed, tic = HEADER.unpack_from(data)
+
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("File {} is not a game session of version {}".format(path, VERSION))
+
+    keys = defaultdict(list)
+    ticks = 0
+    offset = HEADER.size
+    key_size = array(KEYS_TYPECODE).itemsize
+
+    while offset + RECORD.size <= len(data):
+        tick, keys_number = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        ticks = tick
+
+        if not keys_number:
+            break
+
+        chunk = array(KEYS_TYPECODE)
+        chunk.frombytes(data[offset:offset + keys_number * key_size])
+        offset += keys_number * key_size
+
+        keys[tick].extend(chunk)
+
+    # session which was not closed ends on its last recorded tick
+    return Replay(height, width, seed, tic, ticks, dict(keys))
@@ -0,0 +1,275 @@
+import curses
+
+
+STARS_LAYER, GARBAGE_LAYER, EXPLOSIONS_LAYER, ROCKET_LAYER, HUD_LAYER = range(5)
+
+# blank cell of layer which hides lower layers, it is shown as space
+OPAQUE_BLANK = "\0"
+
+
+class _BufferCanvas:
+    """Base of canvas-like buffers which keep symbols and attributes in lists of rows."""
+
+    def __init__(self, height, width):
+        self.height, self.width = height, width
+
+        self._chars = [[" "] * width for _ in range(height)]
+        self._attrs = [[0] * width for _ in range(height)]
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def _check_position(self, row, column):
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise curses.error(f"Position {row}, {column} is out of frame buffer")
+
+    def _mark_dirty(self, row, start_column, end_column):
+        """Hook called on every change of the buffer, subclasses track changed parts in it."""
+
+    def addch(self, row, column, symbol, attr=0):
+        self._check_position(row, column)
+
+        self._chars[row][column] = symbol
+        self._attrs[row][column] = attr
+        self._mark_dirty(row, column, column + 1)
+
+    def addstr(self, row, column, text, attr=0):
+        self._check_position(row, column)
+
+        # text is cut by the right side unlike curses which wraps it
+        end = min(column + len(text), self.width)
+        text = text[:end - column]
+        chars, attrs = self._chars[row], self._attrs[row]
+
+        # the same text on the same place, e.g. sprite drawn every tick, is not a change
+        if "".join(chars[column:end]) == text and attrs[column:end].count(attr) == len(text):
+            return
+
+        chars[column:end] = text
+        attrs[column:end] = [attr] * len(text)
+        self._mark_dirty(row, column, end)
+
+    def border(self, left=0, right=0, top=0, bottom=0,
+               top_left=0, top_right=0, bottom_left=0, bottom_right=0):
+        """Draw border like curses does, 0 means default line symbol."""
+
+        # ACS symbols are available only after curses initialization
+        left = left or getattr(curses, "ACS_VLINE", ord("|"))
+        right = right or getattr(curses, "ACS_VLINE", ord("|"))
+        top = top or getattr(curses, "ACS_HLINE", ord("-"))
+        bottom = bottom or getattr(curses, "ACS_HLINE", ord("-"))
+        top_left = top_left or getattr(curses, "ACS_ULCORNER", ord("+"))
+        top_right = top_right or getattr(curses, "ACS_URCORNER", ord("+"))
+        bottom_left = bottom_left or getattr(curses, "ACS_LLCORNER", ord("+"))
+        bottom_right = bottom_right or getattr(curses, "ACS_LRCORNER", ord("+"))
+
+        last_row, last_column = self.height - 1, self.width - 1
+
+        for column in range(1, last_column):
+            self.addch(0, column, top)
+            self.addch(last_row, column, bottom)
+
+        for row in range(1, last_row):
+            self.addch(row, 0, left)
+            self.addch(row, last_column, right)
+
+        self.addch(0, 0, top_left)
+        self.addch(0, last_column, top_right)
+        self.addch(last_row, 0, bottom_left)
+        self.addch(last_row, last_column, bottom_right)
+
+
+class FrameBuffer(_BufferCanvas):
+    """Canvas-like frame buffer on top of curses window.
+
+    Objects draw into the back buffer, flush compares it with the frame which is on the screen and
+    writes only changed cells, joining neighbour ones into runs written by a single addstr.
+    Drawing and erasing the same cell during one tick costs no curses calls at all.
+    """
+
+    def __init__(self, canvas):
+        super().__init__(*canvas.getmaxyx())
+        self.canvas = canvas
+
+        # what is on the screen now
+        self._screen_chars = [list(row) for row in self._chars]
+        self._screen_attrs = [list(row) for row in self._attrs]
+        self._dirty_rows = set()
+
+    def _mark_dirty(self, row, start_column, end_column):
+        self._dirty_rows.add(row)
+
+    def _write(self, row, column, symbols, attr):
+        try:
+            if isinstance(symbols, int):
+                self.canvas.addch(row, column, symbols, attr)
+            else:
+                self.canvas.addstr(row, column, symbols, attr)
+
+        except curses.error:
+            # writing to the last cell of window moves cursor out of it,
+            # curses reports error, but the symbol is written anyway
+            end_column = column + (1 if isinstance(symbols, int) else len(symbols))
+            if (row, end_column) != (self.height - 1, self.width):
+                raise
+
+    def _flush_row(self, row):
+        chars, attrs = self._chars[row], self._attrs[row]
+        screen_chars, screen_attrs = self._screen_chars[row], self._screen_attrs[row]
+
+        if chars == screen_chars and attrs == screen_attrs:
+            return
+
+        width = self.width
+        column = 0
+
+        while column < width:
+
+            symbol, attr = chars[column], attrs[column]
+
+            if symbol == screen_chars[column] and attr == screen_attrs[column]:
+                column += 1
+                continue
+
+            # curses symbols are written one by one
+            if isinstance(symbol, int):
+                self._write(row, column, symbol, attr)
+                column += 1
+                continue
+
+            start = column
+            column += 1
+
+            while column < width:
+                next_symbol = chars[column]
+
+                if (attrs[column] != attr or isinstance(next_symbol, int)
+                        or (next_symbol == screen_chars[column] and attr == screen_attrs[column])):
+                    break
+
+                column += 1
+
+            self._write(row, start, "".join(chars[start:column]), attr)
+
+        screen_chars[:] = chars
+        screen_attrs[:] = attrs
+
+    def flush(self):
+        """Write cells changed since the last flush to the canvas."""
+
+        for row in self._dirty_rows:
+            self._flush_row(row)
+
+        self._dirty_rows.clear()
+
+    def refresh(self):
+        self.flush()
+        self.canvas.refresh()
+
+    def getch(self):
+        return self.canvas.getch()
+
+    def keypad(self, flag):
+        self.canvas.keypad(flag)
+
+    def nodelay(self, flag):
+        self.canvas.nodelay(flag)
+
+
+class Layer(_BufferCanvas):
+    """Canvas-like layer of Compositor. Space is a transparent cell, so erasing reveals lower layers.
+
+    OPAQUE_BLANK is a blank cell which hides lower layers, e.g. background of a frame.
+    """
+
+    def __init__(self, compositor):
+        super().__init__(compositor.height, compositor.width)
+        self.compositor = compositor
+
+    def _mark_dirty(self, row, start_column, end_column):
+        self.compositor.mark_dirty(row, start_column, end_column)
+
+    def getch(self):
+        return self.compositor.getch()
+
+    def keypad(self, flag):
+        self.compositor.keypad(flag)
+
+    def nodelay(self, flag):
+        self.compositor.nodelay(flag)
+
+
+class Compositor(FrameBuffer):
+    """Frame buffer composed of z-ordered layers with transparent cells.
+
+    Every object draws to its own layer, so overlapping objects do not wipe each other out and
+    have to be drawn only when they move. Before flush changed spans are composed from the topmost
+    non-transparent cells of layers.
+    """
+
+    def __init__(self, canvas, layers_number=HUD_LAYER + 1):
+
+        assert layers_number > 0, AssertionError("Number of layers has to be more than 0")
+
+        super().__init__(canvas)
+        self.layers = [Layer(self) for _ in range(layers_number)]
+        # row -> [start column, end column] of changed cells
+        self._dirty_spans = {}
+
+    def get_layer(self, z_order):
+        return self.layers[z_order]
+
+    def mark_dirty(self, row, start_column, end_column):
+        span = self._dirty_spans.get(row)
+
+        if span is None:
+            self._dirty_spans[row] = [start_column, end_column]
+            return
+
+        if start_column < span[0]:
+            span[0] = start_column
+        if end_column > span[1]:
+            span[1] = end_column
+
+    def _compose_span(self, row, start_column, end_column):
+        chars, attrs = self._chars[row], self._attrs[row]
+        blank = [" "] * (end_column - start_column)
+
+        # layers which have something to show in the span, from the bottom to the top one
+        visible_layers = [layer for layer in self.layers if layer._chars[row][start_column:end_column] != blank]
+
+        if not visible_layers:
+            chars[start_column:end_column] = blank
+            attrs[start_column:end_column] = [0] * len(blank)
+            return
+
+        # the lowest visible layer is copied as a whole, upper ones cover it cell by cell
+        bottom_layer, *upper_layers = visible_layers
+        chars[start_column:end_column] = bottom_layer._chars[row][start_column:end_column]
+        attrs[start_column:end_column] = bottom_layer._attrs[row][start_column:end_column]
+
+        for layer in upper_layers:
+            layer_chars, layer_attrs = layer._chars[row], layer._attrs[row]
+
+            for column in range(start_column, end_column):
+                symbol = layer_chars[column]
+
+                if symbol != " ":
+                    chars[column] = symbol
+                    attrs[column] = layer_attrs[column]
+
+        if OPAQUE_BLANK in chars[start_column:end_column]:
+            for column in range(start_column, end_column):
+                if chars[column] == OPAQUE_BLANK:
+                    chars[column] = " "
+
+    def flush(self):
+        """Compose changed cells of layers and write them to the canvas."""
+
+        for row, (start_column, end_column) in self._dirty_spans.items():
+            self._compose_span(row, start_column, end_column)
+            self._dirty_rows.add(row)
+
+        self._dirty_spans.clear()
+
+        super().flush()
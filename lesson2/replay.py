@@ -0,0 +1,69 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+from headless import HeadlessCanvas, create_headless_scheduler
+from main import play_the_game
+from profiler import Profiler
+from recorder import read_replay
+
+
+def replay_session(path, profiler=None):
+    """Replay recorded game session on headless canvas as fast as possible.
+
+    Return (scheduler report with replay time, headless canvas).
+    """
+
+    replay = read_replay(path)
+
+    if not replay.ticks:
+        raise ValueError("Session {} has no ticks".format(path))
+
+    random.seed(replay.seed)
+    canvas = HeadlessCanvas(replay.height, replay.width)
+    scheduler = create_headless_scheduler(replay.ticks, replay.tic)
+
+    start = time.perf_counter()
+    report = play_the_game(canvas, replay.tic, scheduler=scheduler, profiler=profiler, replay=replay)
+    seconds = time.perf_counter() - start
+
+    report["seconds"] = seconds
+    report["ticks_per_second"] = report["ticks"] / seconds
+    report["curses_calls"] = sum(canvas.stats.values())
+
+    return report, canvas
+
+
+def grab_args():
+    parser = argparse.ArgumentParser(description="Replay of recorded game session on headless canvas")
+    parser.add_argument("session", action="store",
+                        help="file of session recorded by `main.py --record`")
+    parser.add_argument("-p", "--profile", action="store",
+                        help="file for time of game parts as folded stacks for flame graph, default is no profiling")
+    parser.add_argument("-S", "--screen", action="store_true",
+                        help="print the last screen of session")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+
+    options = grab_args()
+    profiler = Profiler() if options.profile else None
+
+    try:
+        report, canvas = replay_session(options.session, profiler)
+
+    except (OSError, ValueError) as exc:
+        sys.exit("Session can not be replayed: {}".format(exc))
+
+    if profiler is not None:
+        profiler.dump(options.profile)
+
+    if options.screen:
+        print("\n".join(canvas.get_lines()))
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
@@ -2,20 +2,23 @@ import asyncio
 from itertools import cycle
 
 from async_tools import sleep_for
-from curses_tools import draw_frame, get_frame_size, read_controls
-from explosion import explode
-from fire import fire
-from frames.tools import get_frames
+from curses_tools import fold_controls
+from explosion import EXPLOSION_TICS
+from frames.tools import get_sprites
 from gameover import get_game_over
-from physics import update_speed
 
 
-async def animate_spaceship(init_frames, spaceship_frame, timeout):
+# space presses kept to shoot on the next ticks, one shot per tick, the rest is dropped, so
+# the held key with auto repeat stops shooting as soon as it is released
+MAX_PENDING_SHOTS = 2
 
-    assert bool(len(init_frames)), AssertionError("Frames can not be empty")
+
+async def animate_spaceship(sprites, spaceship_frame, timeout):
+
+    assert bool(len(sprites)), AssertionError("Frames can not be empty")
     assert timeout >= 0, AssertionError("Timeout have to be non-negative")
 
-    frames = ((frame, *get_frame_size(frame)) for frame in init_frames)
+    frames = [(sprite, sprite.height, sprite.width) for sprite in sprites]
 
     for frame in cycle(frames):
 
@@ -27,19 +30,8 @@ async def animate_spaceship(init_frames, spaceship_frame, timeout):
         await sleep_for(timeout)
 
 
-def calc_location(diff, border):
-
-    if diff < 1:
-        return 1
-
-    if diff > border:
-        return border
-
-    return diff
-
-
-async def run_spaceship(canvas, spaceship_frame, coroutines, obstacles,
-                        obstacles_collisions, years, timeout, row, column):
+async def run_spaceship(canvas, controls, spaceship_frame, coroutines, shots, explosions, bodies, obstacles,
+                        obstacles_collisions, years, timeout, row, column, hud_canvas=None):
 
     assert all(i >= 0 for i in (row, column, timeout)), AssertionError(
         "row, column and timeout have to be non-negative")
@@ -47,77 +39,97 @@ async def run_spaceship(canvas, spaceship_frame, coroutines, obstacles,
 
     height, width = canvas.getmaxyx()
 
-    row_speed = 0
-    column_speed = 0
-
     # "spinlock" waiting for updating spaceship_frame
     while not spaceship_frame:
         await asyncio.sleep(0)
 
-    frame, rocket_height, rocket_width = spaceship_frame
-    draw_frame(canvas, row, column, frame)
+    # rocket is moved by physics, it changes rocket speed according to controls
+    body = bodies.add(row, column, controlled=True)
+
+    sprite, rocket_height, rocket_width = spaceship_frame
+    drawn_sprite, drawn_row, drawn_column = sprite, round(row), round(column)
+    sprite.blit(canvas, drawn_row, drawn_column)
+
+    # space presses which are not shot yet, one shot per tick
+    pending_shots = 0
 
     while True:
 
-        collisions = set(filter(lambda o: o.has_collision(row, column), obstacles))
+        row, column = bodies.get_location(body)
+
+        collisions = obstacles.get_collisions(row, column)
 
         if collisions:
             obstacles_collisions.update(collisions)
 
-            draw_frame(canvas, row, column, frame, negative=True)
+            drawn_sprite.blit(canvas, drawn_row, drawn_column, negative=True)
+            bodies.remove(body)
+
+            explosions.explode(row, column)
 
-            await explode(canvas, row, column)
+            await sleep_for(EXPLOSION_TICS)
 
-            coroutines.append(get_game_over(canvas))
+            coroutines.append(get_game_over(canvas if hud_canvas is None else hud_canvas))
 
             spaceship_frame[0] = None
 
             return
 
         # handle a user control
-        row_shift, col_shift, space = read_controls(canvas)
+        row_shift, col_shift, new_shots = fold_controls(controls.take_batch())
+        bodies.set_directions(body, row_shift, col_shift)
 
-        draw_frame(canvas, row, column, frame, negative=True)
+        # shoot
+        if years[0] >= 2020:
+            pending_shots = min(pending_shots + new_shots, MAX_PENDING_SHOTS)
 
-        row_speed, column_speed = update_speed(row_speed, column_speed, row_shift, col_shift)
+        if pending_shots:
+            pending_shots -= 1
+            shots.fire(row - 1, column + 2, -2)
 
-        # keep rocket in borders
-        row = calc_location(row + row_speed, height - rocket_height - 1)
-        column = calc_location(column + column_speed, width - rocket_width - 1)
+        sprite, rocket_height, rocket_width = spaceship_frame
 
-        # shoot
-        if space and years[0] >= 2020:
-            coroutines.append(fire(canvas, obstacles, obstacles_collisions, row - 1, column + 2, -2))
+        # keep rocket in borders
+        bodies.set_bounds(body, 1, height - rocket_height - 1, 1, width - rocket_width - 1)
 
-        frame, rocket_height, rocket_width = spaceship_frame
-        draw_frame(canvas, row, column, frame)
+        # redraw rocket only if it moved or its frame changed
+        if body in bodies.moved or sprite is not drawn_sprite:
+            drawn_sprite.blit(canvas, drawn_row, drawn_column, negative=True)
+            drawn_sprite, drawn_row, drawn_column = sprite, round(row), round(column)
+            sprite.blit(canvas, drawn_row, drawn_column)
 
         await asyncio.sleep(0)
 
 
-def get_rocket_handlers(canvas, coroutines, obstacles,
-                        obstacles_collisions, years, timeout):
+def get_rocket_handlers(canvas, controls, coroutines, shots, explosions, bodies, obstacles,
+                        obstacles_collisions, years, timeout, hud_canvas=None):
+    """Return rocket coroutines, game over frame is drawn on hud_canvas, on rocket canvas if it is not given."""
 
     assert timeout >= 0, AssertionError("Timeout has to be non-negative")
     assert bool(years), AssertionError("Years has to be initiated with int value.")
 
     height, width = canvas.getmaxyx()
 
-    rocket_frames = get_frames("frames/rocket/rocket_frame_[0-9].txt")
+    rocket_sprites = get_sprites("frames/rocket/rocket_frame_[0-9].txt")
 
     spaceship_frame = []
 
-    animate = animate_spaceship(rocket_frames, spaceship_frame, timeout)
+    animate = animate_spaceship(rocket_sprites, spaceship_frame, timeout)
 
     run = run_spaceship(
         canvas,
+        controls,
         spaceship_frame,
         coroutines,
+        shots,
+        explosions,
+        bodies,
         obstacles,
         obstacles_collisions,
         years,
         timeout,
-        height - (2 + max(get_frame_size(i)[0] for i in rocket_frames)),
-        width // 2)
+        height - (2 + max(sprite.height for sprite in rocket_sprites)),
+        width // 2,
+        hud_canvas)
 
     return [animate, run]
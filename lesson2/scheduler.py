@@ -0,0 +1,348 @@
+import asyncio
+import time
+from collections import deque
+
+
+class TickScheduler:
+    """Fixed timestep loop. Sleeps only for the rest of tick and skips rendering if it falls behind."""
+
+    def __init__(self, tic, max_frame_skip=5, clock=time.monotonic, sleep=time.sleep, max_ticks=None,
+                 async_sleep=asyncio.sleep):
+
+        assert tic > 0, AssertionError("Tic interval has to be more that 0")
+        assert max_frame_skip >= 0, AssertionError("Max frame skip has to be non-negative")
+        assert max_ticks is None or max_ticks > 0, AssertionError("Max ticks has to be None or more than 0")
+
+        self.tic = tic
+        self.max_frame_skip = max_frame_skip
+        # None means running while there is something to update
+        self.max_ticks = max_ticks
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+
+        self.ticks = 0
+        self.renders = 0
+        self.skipped_renders = 0
+        self.overruns = 0
+        # overrun of the last tick in seconds, 0 if tick fits to its interval
+        self.last_overrun = 0.0
+        self.max_overrun = 0.0
+
+    def run(self, update, render):
+        """Call update once per tick while it returns True, call render if there is time for it."""
+
+        deadline = self._clock() + self.tic
+        frames_skipped = 0
+
+        while self.max_ticks is None or self.ticks < self.max_ticks:
+
+            if not update():
+                break
+
+            self.ticks += 1
+            now = self._clock()
+
+            if now > deadline:
+                self._register_overrun(now - deadline)
+
+                if frames_skipped < self.max_frame_skip:
+                    frames_skipped += 1
+                    self.skipped_renders += 1
+                    deadline += self.tic
+                    continue
+
+                # too far behind, render anyway and start counting from now
+                # otherwise game will never catch up
+                deadline = now
+
+            else:
+                self.last_overrun = 0.0
+
+            render()
+            self.renders += 1
+            frames_skipped = 0
+
+            remains = deadline - self._clock()
+            if remains > 0:
+                self._sleep(remains)
+
+            deadline += self.tic
+
+    async def run_async(self, coroutines, update, render):
+        """Run game coroutines from run queue as asyncio tasks on the running loop.
+
+        This coroutine is the frame clock: every tick it calls update, makes tasks of new coroutines
+        and wakes up tasks which are due, then calls render if there is time for it.
+        """
+
+        loop = asyncio.get_running_loop()
+        frame_clock = FrameClock(loop)
+        tasks = set()
+        errors = []
+
+        def forget_task(task):
+            tasks.discard(task)
+
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+
+        deadline = self._clock() + self.tic
+        frames_skipped = 0
+
+        try:
+            while self.max_ticks is None or self.ticks < self.max_ticks:
+
+                update()
+
+                # like in run queue, due coroutines are resumed before the new ones
+                frame_clock.advance()
+
+                for coroutine in coroutines.pop_spawned():
+                    task = loop.create_task(frame_clock.drive(coroutine))
+                    task.add_done_callback(forget_task)
+                    tasks.add(task)
+
+                # the loop runs tasks woken up above before the frame clock
+                await asyncio.sleep(0)
+
+                if errors:
+                    raise errors[0]
+
+                if not tasks and not coroutines:
+                    break
+
+                self.ticks += 1
+                now = self._clock()
+
+                if now > deadline:
+                    self._register_overrun(now - deadline)
+
+                    if frames_skipped < self.max_frame_skip:
+                        frames_skipped += 1
+                        self.skipped_renders += 1
+                        deadline += self.tic
+                        continue
+
+                    deadline = now
+
+                else:
+                    self.last_overrun = 0.0
+
+                render()
+                self.renders += 1
+                frames_skipped = 0
+
+                await self._async_sleep(max(deadline - self._clock(), 0))
+
+                deadline += self.tic
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _register_overrun(self, overrun):
+        self.overruns += 1
+        self.last_overrun = overrun
+        self.max_overrun = max(self.max_overrun, overrun)
+
+    def report(self):
+        """Return dict with ticks statistic."""
+
+        return {
+            "ticks": self.ticks,
+            "renders": self.renders,
+            "skipped_renders": self.skipped_renders,
+            "overruns": self.overruns,
+            "overruns_per_tick": self.overruns / self.ticks if self.ticks else 0.0,
+            "max_overrun": self.max_overrun,
+        }
+
+
+class FrameClock:
+    """Clock of ticks for game coroutines running as asyncio tasks.
+
+    Game coroutines yield number of tics to sleep, which asyncio task can not do, so every game
+    coroutine is driven by the task waiting for the future of its wake-up tick.
+    """
+
+    def __init__(self, loop):
+        self.tick = 0
+        self._loop = loop
+        # tick -> future which is done on it, shared by all tasks sleeping till the tick
+        self._futures = {}
+
+    def wait(self, tics=1):
+        """Return future which is done in tics, 0 or None means the next tick."""
+
+        wake_tick = self.tick + (tics or 1)
+        future = self._futures.get(wake_tick)
+
+        if future is None:
+            future = self._futures[wake_tick] = self._loop.create_future()
+
+        return future
+
+    def advance(self):
+        """Move clock to the next tick and wake up tasks which are due on it."""
+
+        self.tick += 1
+        future = self._futures.pop(self.tick, None)
+
+        if future is not None:
+            future.set_result(self.tick)
+
+    async def drive(self, coroutine):
+        """Resume game coroutine every time its wake-up tick comes."""
+
+        try:
+            while True:
+                try:
+                    tics = coroutine.send(None)
+                except StopIteration:
+                    return
+
+                await self.wait(tics)
+
+        finally:
+            coroutine.close()
+
+
+class TimerWheel:
+    """Hashed timer wheel of sleeping coroutines.
+
+    Coroutine is put into the slot of the tick it has to be woken up on, so every tick only slot of
+    the current tick is looked through instead of resuming all sleeping coroutines.
+    """
+
+    def __init__(self, slots=64):
+
+        assert slots > 0, AssertionError("Number of slots has to be more than 0")
+
+        self.tick = 0
+        self._slots = [[] for _ in range(slots)]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def schedule(self, coroutine, tics=1):
+        """Put coroutine to sleep for tics, 0 or None means the next tick."""
+
+        wake_tick = self.tick + (tics or 1)
+        self._slots[wake_tick % len(self._slots)].append((wake_tick, coroutine))
+        self._size += 1
+
+    def pop_all(self):
+        """Remove all sleeping coroutines from the wheel and return them."""
+
+        coroutines = [coroutine for slot in self._slots for _, coroutine in slot]
+
+        for slot in self._slots:
+            slot.clear()
+        self._size = 0
+
+        return coroutines
+
+    def pop_due(self):
+        """Move wheel to the next tick and return coroutines which are due on it."""
+
+        self.tick += 1
+        index = self.tick % len(self._slots)
+        slot = self._slots[index]
+
+        if not slot:
+            return []
+
+        # the slot holds also coroutines which sleep for more than a whole wheel turn
+        due = [coroutine for wake_tick, coroutine in slot if wake_tick == self.tick]
+        if len(due) == len(slot):
+            self._slots[index] = []
+        else:
+            self._slots[index] = [item for item in slot if item[0] != self.tick]
+
+        self._size -= len(due)
+
+        return due
+
+
+class RunQueue:
+    """Run queue of game coroutines.
+
+    New coroutines go to the spawn buffer and join the ready queue on the next tick, sleeping
+    ones wait in the timer wheel. Finished coroutines are just not put back, so adding and
+    removing costs O(1). With profiler every coroutine resume is measured under its tag.
+    """
+
+    def __init__(self, timer_wheel=None, profiler=None):
+        self._ready = deque()
+        self._spawned = deque()
+        self._sleeping = timer_wheel or TimerWheel()
+        self._profiler = profiler
+
+    def __len__(self):
+        return len(self._ready) + len(self._spawned) + len(self._sleeping)
+
+    def append(self, coroutine):
+        self._spawned.append(coroutine)
+
+    def extend(self, coroutines):
+        self._spawned.extend(coroutines)
+
+    def run_tick(self):
+        """Resume every coroutine which is due on the next tick. Return True if there are coroutines left."""
+
+        ready = self._ready
+        ready.extend(self._sleeping.pop_due())
+        ready.extend(self._spawned)
+        self._spawned.clear()
+
+        if self._profiler is not None:
+            self._run_profiled(ready)
+            return bool(self)
+
+        while ready:
+            coroutine = ready.popleft()
+
+            try:
+                tics = coroutine.send(None)
+
+            except StopIteration:
+                continue
+
+            self._sleeping.schedule(coroutine, tics)
+
+        return bool(self)
+
+    def _run_profiled(self, ready):
+        resume = self._profiler.resume
+
+        while ready:
+            coroutine = ready.popleft()
+
+            try:
+                tics = resume(coroutine)
+
+            except StopIteration:
+                continue
+
+            self._sleeping.schedule(coroutine, tics)
+
+    def pop_spawned(self):
+        """Remove coroutines from the spawn buffer and return them."""
+
+        spawned = list(self._spawned)
+        self._spawned.clear()
+
+        return spawned
+
+    def close(self):
+        """Close all coroutines left in the queue."""
+
+        for coroutine in (*self._ready, *self._spawned, *self._sleeping.pop_all()):
+            coroutine.close()
+
+        self._ready.clear()
+        self._spawned.clear()
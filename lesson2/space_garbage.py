@@ -2,67 +2,73 @@ import asyncio
 from random import choice, randint
 
 from async_tools import sleep_for
-from curses_tools import draw_frame, get_frame_size
-from explosion import explode
-from frames.tools import get_frames
+from frames.tools import get_sprites
 from game_scenario import get_garbage_delay_tics
 from obstacles import Obstacle
 
 
-async def fly_garbage(canvas, obstacles, obstacles_collisions,
-                      column, garbage_frame, speed=0.5):
+async def fly_garbage(canvas, explosions, bodies, obstacles, obstacles_collisions,
+                      column, sprite, speed=0.5):
     """Animate garbage, flying from top to bottom. Column position will stay same, as specified on start.
 
     E.g.
-        with open('garbage.txt', "r") as garbage_file:
-            frame = garbage_file.read()
+        sprite, *_ = get_sprites("frames/garbage/duck.txt")
 
-        coroutine = fly_garbage(canvas, 10, frame):
+        coroutine = fly_garbage(canvas, explosions, bodies, obstacles, obstacles_collisions, 10, sprite)
     """
 
     assert speed > 0, AssertionError("Speed has to be positive")
-    assert len(garbage_frame) and all(garbage_frame), AssertionError(
+    assert sprite.height and sprite.width, AssertionError(
         "Frame can not be empty or has 0 height or width")
 
-    frame, frame_height, frame_width = garbage_frame
-
     rows_number, columns_number = canvas.getmaxyx()
 
     column = max(column, 0)
     column = min(column, columns_number - 1)
     row = 0
 
-    obstacle = Obstacle(row, column, frame_height, frame_width)
+    obstacle = Obstacle(row, column, sprite.height, sprite.width)
     obstacles.add(obstacle)
 
-    while row < rows_number:
+    # garbage is moved by physics
+    body = bodies.add(row, column, speed)
 
-        if obstacle in obstacles_collisions:
-            draw_frame(canvas, row, column, frame, negative=True)
+    drawn_row = round(row)
+    sprite.blit(canvas, drawn_row, column)
 
-            await explode(canvas, row, column)
+    try:
+        while row < rows_number:
 
-            break
+            await asyncio.sleep(0)
 
-        draw_frame(canvas, row, column, frame)
+            if obstacle in obstacles_collisions:
+                sprite.blit(canvas, drawn_row, column, negative=True)
 
-        await asyncio.sleep(0)
+                explosions.explode(row, column)
+
+                return
 
-        draw_frame(canvas, row, column, frame, negative=True)
+            row, _ = bodies.get_location(body)
+            obstacle.move_to(row, column)
 
-        row += speed
+            if body in bodies.moved:
+                sprite.blit(canvas, drawn_row, column, negative=True)
+                drawn_row = round(row)
 
-        obstacle.row = row
+            # other garbage on the layer may erase a part of this one, so it is drawn every tick,
+            # the layer skips unchanged symbols
+            sprite.blit(canvas, drawn_row, column)
 
-    # delete obstacle
-    obstacles.discard(obstacle)
+        sprite.blit(canvas, drawn_row, column, negative=True)
 
-    # restore borders
-    border = ord('|')
-    canvas.border(border, border)
+    finally:
+        bodies.remove(body)
+        # delete obstacle
+        obstacles.discard(obstacle)
+        obstacles_collisions.discard(obstacle)
 
 
-async def fill_orbit_with_garbage(canvas, coroutines, obstacles,
+async def fill_orbit_with_garbage(canvas, coroutines, explosions, bodies, obstacles,
                                   obstacles_collisions, years):
 
     assert bool(years), AssertionError("Years has to be initiated with int value.")
@@ -71,7 +77,7 @@ async def fill_orbit_with_garbage(canvas, coroutines, obstacles,
     _, width = canvas.getmaxyx()
     width -= 1
 
-    garbage_frames = [(i, *get_frame_size(i)) for i in get_frames("frames/garbage/*.txt")]
+    garbage_sprites = get_sprites("frames/garbage/*.txt")
 
     # waiting for garbage epoch
     while get_garbage_delay_tics(years[0]) is None:
@@ -79,13 +85,12 @@ async def fill_orbit_with_garbage(canvas, coroutines, obstacles,
 
     while True:
 
-        frame = choice(garbage_frames)
-        _, _, frame_width = frame
-        column = randint(1, width - frame_width)
+        sprite = choice(garbage_sprites)
+        column = randint(1, width - sprite.width)
         speed = randint(1, 4) / 10
 
-        coroutines.append(fly_garbage(canvas, obstacles, obstacles_collisions,
-                                      column, frame, speed))
+        coroutines.append(fly_garbage(canvas, explosions, bodies, obstacles, obstacles_collisions,
+                                      column, sprite, speed))
 
         # waiting before adding new one
         await sleep_for(get_garbage_delay_tics(years[0]))
@@ -1,31 +1,90 @@
+import asyncio
 import curses
-from itertools import cycle, islice
+from array import array
+from collections import defaultdict
+from itertools import cycle
 from random import choice, randint, sample
 
-from async_tools import sleep_for
 
+STARS_SYMBOLS = '+*.:'
 
-async def blink(canvas, row, column, behaviors, init_delay, symbol):
+# (timeout, attribute) of blinking phases
+STAR_PHASES = (
+    (20, curses.A_DIM),
+    (3, curses.A_NORMAL),
+    (5, curses.A_BOLD),
+    (3, curses.A_NORMAL))
 
-    assert all(i >= 0 for i in (row, column, init_delay)), AssertionError(
-        "row, column and delay have to be non-negative")
-    assert symbol.isprintable(), AssertionError("Star symbol has to be printable")
 
-    # init star
-    _, *star_attr = next(behaviors)
-    canvas.addstr(row, column, symbol, *star_attr)
+class StarField:
+    """All stars of canvas kept in arrays instead of coroutine per star.
 
-    # delay for randomizing time of start star's blinking
-    await sleep_for(init_delay)
+    Every star has its blinking phase, stars are grouped by tick their phase changes on, so each
+    tick only stars which change attribute are redrawn.
+    """
 
-    for timeout, *star_attr in behaviors:
+    def __init__(self, canvas, rows, columns, symbols, phases, delays):
 
-        canvas.addstr(row, column, symbol, *star_attr)
+        assert len(rows) == len(columns) == len(symbols) == len(phases) == len(delays), AssertionError(
+            "Rows, columns, symbols, phases and delays have to be the same length")
+        assert all(i >= 0 for i in (*rows, *columns, *delays)), AssertionError(
+            "row, column and delay have to be non-negative")
+        assert all(symbol.isprintable() for symbol in symbols), AssertionError("Star symbol has to be printable")
 
-        await sleep_for(timeout)
+        self.canvas = canvas
+        self.rows = array("H", rows)
+        self.columns = array("H", columns)
+        self.symbols = list(symbols)
+        self.phases = bytearray(phases)
 
+        self.tick = 0
+        # tick -> stars which change phase on it
+        self._changes = defaultdict(list)
 
-def get_stars(canvas, num_starts):
+        for star, delay in enumerate(delays):
+            self._draw(star)
+            # delay for randomizing time of start star's blinking
+            self._changes[delay or 1].append(star)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _draw(self, star):
+        _, attr = STAR_PHASES[self.phases[star]]
+        self.canvas.addstr(self.rows[star], self.columns[star], self.symbols[star], attr)
+
+    def step(self):
+        """Move field to the next tick, redraw stars which change phase. Return number of redrawn stars."""
+
+        self.tick += 1
+        stars = self._changes.pop(self.tick, None)
+
+        if not stars:
+            return 0
+
+        phases = self.phases
+        phases_number = len(STAR_PHASES)
+
+        for star in stars:
+            phase = (phases[star] + 1) % phases_number
+            phases[star] = phase
+
+            self._draw(star)
+
+            timeout, _ = STAR_PHASES[phase]
+            self._changes[self.tick + timeout].append(star)
+
+        return len(stars)
+
+    async def animate(self):
+
+        while True:
+            self.step()
+
+            await asyncio.sleep(0)
+
+
+def get_star_field(canvas, num_starts):
 
     assert num_starts > 0, AssertionError("Number of stars has to be at least 1")
 
@@ -34,8 +93,6 @@ def get_stars(canvas, num_starts):
     assert num_starts <= round(height * width * 0.33), AssertionError(
         "Number of stars is too large, it has to be less or equal {}, this covers 33%% of canvas".format(round(height * width * 0.33)))
 
-    stars = '+*.:'
-
     height_border = height - 1
     width_border = width - 1
     height_points = height_border - 1
@@ -45,22 +102,14 @@ def get_stars(canvas, num_starts):
     rows = cycle(randomized_rows)
     cols = cycle(randomized_cols)
 
-    actions = (
-        (20, curses.A_DIM),
-        (3, ),
-        (5, curses.A_BOLD),
-        (3, ))
-
-    actions_border = len(actions) - 1
-
-    return (
-        blink(
-            canvas,
-            next(rows),
-            next(cols),
-            # randomizing star state
-            islice(cycle(actions), randint(0, actions_border), None),
-            # randomizing star blinking
-            randint(2, 26),
-            choice(stars)
-        ) for _ in range(num_starts))
+    phases_border = len(STAR_PHASES) - 1
+
+    return StarField(
+        canvas,
+        [next(rows) for _ in range(num_starts)],
+        [next(cols) for _ in range(num_starts)],
+        [choice(STARS_SYMBOLS) for _ in range(num_starts)],
+        # randomizing star state
+        [randint(0, phases_border) for _ in range(num_starts)],
+        # randomizing star blinking
+        [randint(2, 26) for _ in range(num_starts)])
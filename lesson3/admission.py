@@ -0,0 +1,123 @@
+import asyncio
+from bisect import bisect_left
+from collections import deque
+
+
+# upper bounds of wait time buckets in seconds, the last bucket is for longer waits
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+class AdmissionController:
+    """Limit of concurrent archive jobs with bounded queue of jobs waiting for a free slot.
+
+    Slot of finished job is handed over to the first waiting one, so jobs are admitted in order of
+    arrival. Job is rejected when the queue is full or its waiting is longer than queue timeout.
+    """
+
+    def __init__(self, max_jobs, queue_size, queue_timeout):
+        assert max_jobs > 0, AssertionError("Number of jobs has to be more than 0.")
+        assert queue_size >= 0, AssertionError("Queue size has to be non-negative.")
+        assert queue_timeout >= 0.0, AssertionError("Queue timeout has to be positive.")
+
+        self.max_jobs = max_jobs
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._waiters = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Wait for free slot of job. Return False if job is rejected, otherwise slot has to be released."""
+
+        if self.active < self.max_jobs and not self._waiters:
+            self.active += 1
+            self._admit(0.0)
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        # controller is made before the app is started, so the loop is taken when job has to wait
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.queue_timeout, self._expire, waiter)
+
+        try:
+            admitted = await waiter
+
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                # slot was handed over right before cancellation
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+        finally:
+            timer.cancel()
+
+        if admitted:
+            self._admit(loop.time() - start)
+
+        return admitted
+
+    def release(self):
+        """Free slot of finished job, it goes to the first waiting job if there is one."""
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+
+        self.active -= 1
+
+    def _expire(self, waiter):
+        if waiter.done():
+            return
+
+        self._waiters.remove(waiter)
+        self.timed_out += 1
+        waiter.set_result(False)
+
+    def _admit(self, wait):
+        self.admitted += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, wait)] += 1
+
+    def get_stats(self):
+        """Return dict of current load, numbers of admitted and rejected jobs and their wait times."""
+
+        buckets = {str(bound): count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)}
+        buckets["inf"] = self.wait_buckets[-1]
+
+        return {
+            "active": self.active,
+            "max_jobs": self.max_jobs,
+            "queued": self.queued,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_seconds": {
+                "total": self.wait_total,
+                "max": self.wait_max,
+                "mean": self.wait_total / self.admitted if self.admitted else 0.0,
+                # numbers of admitted jobs by wait time, up to the bucket bound and longer than the previous one
+                "buckets": buckets}}
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import os
+import os.path
+from collections import OrderedDict
+from uuid import uuid4
+
+import aiofiles
+
+
+TEMP_SUFFIX = ".tmp"
+
+
+def get_archive_key(path, archive_type):
+    """Return key of archive of the folder files.
+
+    Key is the hash of folder name, archive type and names, mtimes and sizes of all files in it, so any
+    change of the folder contents gives a new key.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(f"{os.path.basename(path)}\0{archive_type}\0".encode())
+
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names.sort()
+
+        for name in sorted((*dir_names, *file_names)):
+            full_path = os.path.join(dir_path, name)
+            stat = os.stat(full_path)
+            digest.update(f"{os.path.relpath(full_path, path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode())
+
+    return digest.hexdigest()
+
+
+class ArchiveCache:
+    """On-disk cache of archives with size bounded LRU eviction.
+
+    Archive is kept in the file named by its key, so it is valid while the folder contents are the same.
+    New archive is written to temporary file which is renamed only when archive is complete.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        assert bool(cache_dir), AssertionError("Cache directory has to be defined.")
+        assert max_size > 0, AssertionError("Cache size has to be more than 0.")
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.size = 0
+        # archive name -> size, the least recently used first
+        self._archives = OrderedDict()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        archives = []
+        for entry in os.scandir(cache_dir):
+            if not entry.is_file():
+                continue
+
+            # leftovers of writing interrupted by the server stop
+            if entry.name.endswith(TEMP_SUFFIX):
+                os.remove(entry.path)
+                continue
+
+            stat = entry.stat()
+            archives.append((stat.st_atime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(archives):
+            self._archives[name] = size
+            self.size += size
+
+        self._evict()
+
+    def __len__(self):
+        return len(self._archives)
+
+    def get(self, key):
+        """Return path of archive or None if it is not cached."""
+
+        if key not in self._archives:
+            return None
+
+        path = os.path.join(self.cache_dir, key)
+
+        if not os.path.exists(path):
+            self.size -= self._archives.pop(key)
+            return None
+
+        self._archives.move_to_end(key)
+
+        return path
+
+    def create_writer(self, key):
+        return CachedArchiveWriter(self, key)
+
+    def add(self, key, temp_path):
+        """Move complete archive from temporary file to the cache."""
+
+        size = os.path.getsize(temp_path)
+
+        if size > self.max_size:
+            logging.debug(f"Archive {key} of {size} bytes is larger than cache")
+            os.remove(temp_path)
+            return
+
+        os.replace(temp_path, os.path.join(self.cache_dir, key))
+
+        self.size -= self._archives.pop(key, 0)
+        self._archives[key] = size
+        self.size += size
+
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_size:
+            key, size = self._archives.popitem(last=False)
+            self.size -= size
+
+            logging.debug(f"Archive {key} of {size} bytes is evicted from cache")
+
+            try:
+                os.remove(os.path.join(self.cache_dir, key))
+            except FileNotFoundError:
+                pass
+
+
+class CachedArchiveWriter:
+    """Writer of archive to the cache while it is sent to the client.
+
+    Failed writing, e.g. when disk is full, does not break sending, the archive is just not cached.
+    """
+
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        self.temp_path = os.path.join(cache.cache_dir, f"{key}.{uuid4().hex}{TEMP_SUFFIX}")
+        self._file = None
+        self._closed = False
+
+    async def write(self, chunk):
+        if self._closed:
+            return
+
+        try:
+            if self._file is None:
+                self._file = await aiofiles.open(self.temp_path, mode="wb")
+
+            await self._file.write(chunk)
+
+        except OSError as exc:
+            logging.warning(f"Archive {self.key} can not be cached: {exc}")
+            await self.discard()
+
+    async def commit(self):
+        """Put written archive to the cache."""
+
+        if self._closed:
+            return
+
+        try:
+            if self._file is None:
+                self._file = await aiofiles.open(self.temp_path, mode="wb")
+
+            await self._file.close()
+            self._closed = True
+
+            self.cache.add(self.key, self.temp_path)
+
+        except OSError as exc:
+            logging.warning(f"Archive {self.key} can not be cached: {exc}")
+            await self.discard()
+
+    async def discard(self):
+        """Drop written part of archive, e.g. when sending was interrupted."""
+
+        if self._file is not None and not self._closed:
+            await self._file.close()
+
+        self._closed = True
+
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,297 @@
+import asyncio
+import os
+import os.path
+import struct
+import tarfile
+import time
+import zlib
+
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# limit of sizes and offsets in zip records without zip64 extensions
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+# bit 3: sizes and crc are in the data descriptor after file data, bit 11: names are UTF-8
+ZIP_FLAGS = 0x08 | 0x800
+# version made by: unix, so external attributes keep file mode
+ZIP_CREATE_SYSTEM = 3
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+DATA_DESCRIPTOR = struct.Struct("<IIII")
+DATA_DESCRIPTOR64 = struct.Struct("<IIQQ")
+DATA_DESCRIPTOR_SIGNATURE = 0x08074B50
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+CENTRAL_HEADER_SIGNATURE = 0x02014B50
+END_RECORD = struct.Struct("<IHHHHIIH")
+END_RECORD_SIGNATURE = 0x06054B50
+END_RECORD64 = struct.Struct("<IQHHIIQQQQ")
+END_RECORD64_SIGNATURE = 0x06064B50
+END_LOCATOR64 = struct.Struct("<IIQI")
+END_LOCATOR64_SIGNATURE = 0x07064B50
+ZIP64_EXTRA_ID = 0x0001
+
+TAR_BLOCK_SIZE = tarfile.BLOCKSIZE
+TAR_RECORD_SIZE = tarfile.RECORDSIZE
+
+DEFAULT_COMPRESSLEVEL = 6
+
+# compressed already, compression burns CPU gaining almost nothing, so they are stored as is
+STORED_EXTENSIONS = frozenset((
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic",
+    ".mp3", ".ogg", ".mp4", ".m4v", ".mov", ".avi", ".mkv", ".webm",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar"))
+
+
+def list_files(path):
+    """Return sorted list of (file path, name in archive) of all files in the folder, hidden ones are skipped."""
+
+    files = []
+
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names[:] = sorted(name for name in dir_names if not name.startswith("."))
+
+        for name in sorted(file_names):
+            if name.startswith("."):
+                continue
+
+            full_path = os.path.join(dir_path, name)
+            files.append((full_path, os.path.relpath(full_path, path).replace(os.sep, "/")))
+
+    return files
+
+
+def get_file_compresslevel(name, compresslevel):
+    """Return compression level of file by its type, 0 means file is stored."""
+
+    _, extension = os.path.splitext(name)
+
+    return 0 if extension.lower() in STORED_EXTENSIONS else compresslevel
+
+
+def _get_dos_time(timestamp):
+    # zip keeps local time since 1980 with 2 seconds precision
+    year, month, day, hour, minute, second, *_ = time.localtime(max(timestamp, 315532800))
+
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _read_chunks(file, chunk_size, size=None):
+    """Yield chunks of file, at most size bytes if it is given."""
+
+    while size is None or size > 0:
+        chunk = file.read(chunk_size if size is None else min(chunk_size, size))
+
+        if not chunk:
+            return
+
+        if size is not None:
+            size -= len(chunk)
+
+        yield chunk
+
+
+def iter_zip(files, chunk_size, compresslevel=DEFAULT_COMPRESSLEVEL):
+    """Yield zip archive of files by chunks of about chunk_size bytes.
+
+    Archive is written as a stream: sizes and crc of file follow its data in the data descriptor,
+    so file is read only once. Zip64 records are used only for large files and archives.
+    Compressed media files are stored, other ones are deflated with compresslevel, 0 stores all files.
+    """
+
+    buffer = bytearray()
+    # entries of the central directory: (name, method, dos time, dos date, crc, compressed size, size, offset, mode)
+    entries = []
+    offset = 0
+
+    for path, name in files:
+        stat = os.stat(path)
+        encoded_name = name.encode("utf-8")
+        dos_time, dos_date = _get_dos_time(stat.st_mtime)
+        level = get_file_compresslevel(name, compresslevel)
+        method = ZIP_DEFLATED if level else ZIP_STORED
+        # the same rule as zipfile has, deflated data may be a bit larger than the file
+        zip64 = stat.st_size * 1.05 > ZIP64_LIMIT
+
+        extra = b""
+        if zip64:
+            # sizes are in the data descriptor, zip64 extra tells that they are 8 bytes long there
+            extra = struct.pack("<HHQQ", ZIP64_EXTRA_ID, 16, 0, 0)
+
+        local_offset = offset
+        header = LOCAL_HEADER.pack(
+            LOCAL_HEADER_SIGNATURE, ZIP64_VERSION if zip64 else ZIP_VERSION, ZIP_FLAGS, method,
+            dos_time, dos_date, 0, ZIP64_LIMIT if zip64 else 0, ZIP64_LIMIT if zip64 else 0,
+            len(encoded_name), len(extra))
+        buffer += header
+        buffer += encoded_name
+        buffer += extra
+        offset += len(header) + len(encoded_name) + len(extra)
+
+        crc = 0
+        size = compressed_size = 0
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if level else None
+
+        with open(path, "rb") as file:
+            for chunk in _read_chunks(file, chunk_size):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+
+                data = compressor.compress(chunk) if compressor else chunk
+                compressed_size += len(data)
+                buffer += data
+
+                if len(buffer) >= chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+
+        if compressor:
+            data = compressor.flush()
+            compressed_size += len(data)
+            buffer += data
+
+        offset += compressed_size
+
+        if zip64:
+            descriptor = DATA_DESCRIPTOR64.pack(DATA_DESCRIPTOR_SIGNATURE, crc, compressed_size, size)
+        else:
+            descriptor = DATA_DESCRIPTOR.pack(DATA_DESCRIPTOR_SIGNATURE, crc, compressed_size, size)
+
+        buffer += descriptor
+        offset += len(descriptor)
+
+        entries.append((encoded_name, method, dos_time, dos_date, crc, compressed_size, size, local_offset,
+                        stat.st_mode))
+
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    central_offset = offset
+
+    for encoded_name, method, dos_time, dos_date, crc, compressed_size, size, local_offset, mode in entries:
+
+        # values which do not fit to the record go to zip64 extra in this order
+        zip64_values = [value for value in (size, compressed_size, local_offset) if value >= ZIP64_LIMIT]
+        extra = b""
+        if zip64_values:
+            extra = struct.pack(f"<HH{len(zip64_values)}Q", ZIP64_EXTRA_ID, 8 * len(zip64_values), *zip64_values)
+
+        version = ZIP64_VERSION if zip64_values else ZIP_VERSION
+        header = CENTRAL_HEADER.pack(
+            CENTRAL_HEADER_SIGNATURE, (ZIP_CREATE_SYSTEM << 8) | version, version, ZIP_FLAGS, method,
+            dos_time, dos_date, crc, min(compressed_size, ZIP64_LIMIT), min(size, ZIP64_LIMIT),
+            len(encoded_name), len(extra), 0, 0, 0, (mode & 0xFFFF) << 16, min(local_offset, ZIP64_LIMIT))
+
+        buffer += header
+        buffer += encoded_name
+        buffer += extra
+        offset += len(header) + len(encoded_name) + len(extra)
+
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    central_size = offset - central_offset
+
+    if len(entries) >= ZIP_MAX_ENTRIES or central_size >= ZIP64_LIMIT or central_offset >= ZIP64_LIMIT:
+        buffer += END_RECORD64.pack(
+            END_RECORD64_SIGNATURE, END_RECORD64.size - 12, ZIP64_VERSION, ZIP64_VERSION, 0, 0,
+            len(entries), len(entries), central_size, central_offset)
+        buffer += END_LOCATOR64.pack(END_LOCATOR64_SIGNATURE, 0, offset, 1)
+
+    entries_number = min(len(entries), ZIP_MAX_ENTRIES)
+    buffer += END_RECORD.pack(
+        END_RECORD_SIGNATURE, 0, 0, entries_number, entries_number,
+        min(central_size, ZIP64_LIMIT), min(central_offset, ZIP64_LIMIT), 0)
+
+    yield bytes(buffer)
+
+
+def iter_tar_gz(files, chunk_size, compresslevel=DEFAULT_COMPRESSLEVEL):
+    """Yield tar.gz archive of files by chunks of about chunk_size bytes.
+
+    Level of deflate can not be changed inside of gzip stream, so compressed media files go to their own
+    gzip members with level 0, i.e. stored deflate blocks. Concatenated members are a valid gzip file.
+    """
+
+    buffer = bytearray()
+    level = compresslevel
+    # wbits 31 means gzip header and trailer around deflated data
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    tar_size = 0
+
+    for path, name in files:
+
+        file_level = get_file_compresslevel(name, compresslevel)
+        if file_level != level:
+            buffer += compressor.flush()
+            level = file_level
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+
+            info = tarfile.TarInfo(name)
+            info.size = stat.st_size
+            info.mtime = int(stat.st_mtime)
+            info.mode = stat.st_mode & 0o7777
+
+            header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+            buffer += compressor.compress(header)
+            tar_size += len(header)
+
+            written = 0
+            for chunk in _read_chunks(file, chunk_size, info.size):
+                written += len(chunk)
+                buffer += compressor.compress(chunk)
+
+                if len(buffer) >= chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+
+        # size is in the header already, file which became shorter is filled with zeros
+        padding = info.size - written + (-info.size % TAR_BLOCK_SIZE)
+        buffer += compressor.compress(bytes(padding))
+        tar_size += info.size + -info.size % TAR_BLOCK_SIZE
+
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    # end of archive is two empty blocks, archive is filled up to the whole record
+    end_size = 2 * TAR_BLOCK_SIZE
+    end_size += -(tar_size + end_size) % TAR_RECORD_SIZE
+    buffer += compressor.compress(bytes(end_size))
+    buffer += compressor.flush()
+
+    yield bytes(buffer)
+
+
+class ArchiveStream:
+    """Async reader of archive chunks which are made in the thread pool, so event loop never waits for compression."""
+
+    def __init__(self, loop, chunks, executor=None):
+        self._loop = loop
+        self._chunks = chunks
+        self._executor = executor
+        self._future = None
+
+    async def read(self):
+        """Return next chunk of archive, empty bytes mean its end."""
+
+        self._future = self._loop.run_in_executor(self._executor, next, self._chunks, b"")
+
+        # cancelled reading does not stop the thread, close waits for it
+        return await asyncio.shield(self._future)
+
+    async def close(self):
+        if self._future is not None and not self._future.done():
+            await asyncio.wait([self._future])
+
+        self._chunks.close()
@@ -1,2 +0,0 @@
-class CompressorIsNotAvailable(Exception):
-    pass
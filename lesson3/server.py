@@ -1,28 +1,29 @@
 import argparse
 import asyncio
 import logging
+import math
 import os.path
 from enum import Enum
 from functools import partial
-from glob import iglob
 from os import getenv
-from shutil import which
 from uuid import uuid4
 
 import aiofiles
 from aiohttp import web
 
-from exceptions import CompressorIsNotAvailable
+from admission import AdmissionController
+from archive_cache import ArchiveCache, get_archive_key
+from archivers import DEFAULT_COMPRESSLEVEL, ArchiveStream, iter_tar_gz, iter_zip, list_files
 
 
 class Compressors(Enum):
-    ZIP = ("zip -9 -r -q - ", "zip", bool(which("zip")))
-    GZ = ("tar --absolute-names -czf - ", "tar.gz", bool(which("tar")))
+    ZIP = ("zip", iter_zip)
+    GZ = ("tar.gz", iter_tar_gz)
 
-    def __init__(self, command, extension, installed):
-        self.command = command
+    def __init__(self, extension, iter_archive):
         self.extension = extension
-        self.installed = installed
+        # generator of archive chunks: iter_archive(files, chunk_size, compresslevel)
+        self.iter_archive = iter_archive
 
 
 def get_headers(filename, extension):
@@ -55,12 +56,84 @@ def request_id_msg(request_id, message):
     return f"Request ID {request_id}: <{message}>"
 
 
-async def archive_files(loop, arch_cmd, chunk_size, headers, files_root, delay, request):
+def get_file_etag(path):
+    stat = os.stat(path)
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def is_etag_matched(etag, header):
+    """Check if etag is in the list of If-None-Match or If-Range header, weak tags match too."""
+
+    tags = [tag.strip() for tag in header.split(",")]
+
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class ArchiveFileResponse(web.FileResponse):
+    """File response with ETag of the archive.
+
+    Newer aiohttp sets ETag of file mtime and size on prepare, here it is kept the same as streamed response
+    of the archive has, so download started by the streamed response may be resumed by If-Range.
+    """
+
+    def __init__(self, path, archive_etag, **kwargs):
+        super().__init__(path, **kwargs)
+        self._archive_etag = archive_etag
+        self.headers["ETag"] = archive_etag
+
+    @property
+    def etag(self):
+        return self._archive_etag
+
+    @etag.setter
+    def etag(self, _):
+        self.headers["ETag"] = self._archive_etag
+
+
+async def send_archive_file(request, path, etag, chunk_size, headers, log_message):
+    """Send archive file which is on disk, e.g. cached or pre-built one.
+
+    File is sent by sendfile, Range request gets the part of it, If-None-Match with the same ETag
+    gets 304 without body.
+    """
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and is_etag_matched(etag, if_none_match):
+        logging.debug(log_message(f"Archive is not modified: {etag}"))
+
+        raise web.HTTPNotModified(headers={"ETag": etag, "X-Request-ID": headers["X-Request-ID"]})
+
+    if_range = request.headers.get("If-Range", "")
+    if "Range" in request.headers and if_range.startswith(("\"", "W/")) and if_range != etag:
+        # archive was changed since the part was downloaded, the whole one has to be sent,
+        # the range handling of FileResponse knows only dates, so the file is sent by chunks
+        logging.debug(log_message(f"Range of other archive {if_range} is requested, sending the whole one"))
+
+        response = web.StreamResponse(headers=headers)
+        response.headers["ETag"] = etag
+        response.content_length = os.path.getsize(path)
+        await response.prepare(request)
+
+        async with aiofiles.open(path, mode="rb") as archive_file:
+            archive_chunk = await archive_file.read(chunk_size)
+
+            while archive_chunk:
+                await response.write(archive_chunk)
+                archive_chunk = await archive_file.read(chunk_size)
+
+        return response
+
+    return ArchiveFileResponse(path, etag, chunk_size=chunk_size, headers=headers)
+
+
+async def archive_files(compressor, compresslevel, chunk_size, headers, files_root, delay, cache, admission, request):
+    assert 0 <= compresslevel <= 9, AssertionError("Compression level has to be from 0 to 9.")
     assert chunk_size > 0, AssertionError("Chunk size has to be more than 0.")
     assert delay >= 0.0, AssertionError("Delay has to be positive.")
-    assert bool(arch_cmd), AssertionError("Compress' command line has to be defined.")
     assert bool(files_root), AssertionError("File's root path has to be defined.")
 
+    # the running loop, Application.loop is not set before the app is started
+    loop = asyncio.get_event_loop()
     archive_hash = request.match_info["archive_hash"]
     request_id = request.headers.get("X-Request-ID", str(uuid4()))
     log_message = partial(request_id_msg, request_id)
@@ -73,6 +146,16 @@ async def archive_files(loop, arch_cmd, chunk_size, headers, files_root, delay,
         raise web.HTTPBadRequest(
             text=f"Archive <{archive_hash}> is not allowed.")
 
+    file_headers = {**headers, "X-Request-ID": request_id}
+
+    # pre-built archive is put next to the folder, e.g. 7kna.zip for 7kna
+    prebuilt_path = os.path.join(files_root, f"{archive_hash}.{compressor.extension}")
+    if os.path.isfile(prebuilt_path):
+        logging.debug(log_message(f"Sending pre-built archive: {prebuilt_path}"))
+
+        return await send_archive_file(request, prebuilt_path, get_file_etag(prebuilt_path),
+                                       chunk_size, file_headers, log_message)
+
     path = os.path.join(files_root, archive_hash)
     if not os.path.exists(path):
         logging.debug(log_message(f"Non-existed request: {archive_hash}"))
@@ -80,38 +163,63 @@ async def archive_files(loop, arch_cmd, chunk_size, headers, files_root, delay,
         raise web.HTTPNotFound(
             text=f"Archive <{archive_hash}> does not exist or was deleted.")
 
+    cache_writer = None
+    if cache is not None:
+        # archives of different compression levels are different files
+        key = await loop.run_in_executor(None, get_archive_key, path, f"{compressor.name}-{compresslevel}")
+        cached_path = cache.get(key)
+
+        if cached_path is not None:
+            logging.debug(log_message(f"Sending cached archive: {cached_path}"))
+
+            # archive of the same files has the same key, so it is ETag of the archive
+            return await send_archive_file(request, cached_path, f'"{key}"',
+                                           chunk_size, file_headers, log_message)
+
+        # archive is written to the cache while it is sent
+        cache_writer = cache.create_writer(key)
+        logging.debug(log_message(f"Archive will be cached as: {key}"))
+
+    # cached and pre-built archives are just files, only making of archive waits for a free slot
+    if not await admission.acquire():
+        logging.debug(log_message(f"Archive job was rejected, jobs: {admission.active}, queued: {admission.queued}"))
+
+        raise web.HTTPServiceUnavailable(
+            headers={"Retry-After": str(math.ceil(admission.queue_timeout) or 1), "X-Request-ID": request_id},
+            text="Server is busy, try again later.")
+
+    try:
+        return await send_archive(compressor, compresslevel, chunk_size, headers, delay, cache_writer,
+                                  path, request_id, log_message, request)
+    finally:
+        admission.release()
+
+
+async def send_archive(compressor, compresslevel, chunk_size, headers, delay, cache_writer, path, request_id,
+                       log_message, request):
+
+    loop = asyncio.get_event_loop()
     response = web.StreamResponse()
     response.headers.extend(headers)
     response.enable_chunked_encoding()
     response.headers["X-Request-ID"] = request_id
+    if cache_writer is not None:
+        # the same as cached archive will have, so its download may be resumed
+        response.headers["ETag"] = f'"{cache_writer.key}"'
     logging.debug(log_message(f"Updating headers with: {headers} and set one chunked"))
 
     await response.prepare(request)
 
-    files = " ".join(iglob(os.path.join(path, "*")))
-    cmd = arch_cmd + files
-    logging.debug(log_message(f"Read data compressor: {arch_cmd} via {chunk_size} bytes chunks"))
+    files = await loop.run_in_executor(None, list_files, path)
     logging.debug(log_message(f"Files for compressing: {files}"))
 
-    try:
-        proc = await asyncio.create_subprocess_shell(cmd, loop=loop,
-                                                     stdout=asyncio.subprocess.PIPE,
-                                                     stdin=asyncio.subprocess.DEVNULL,
-                                                     stderr=asyncio.subprocess.DEVNULL)
-        logging.debug(log_message(f"Compressor pid: {proc.pid}"))
-
-    except asyncio.CancelledError:
-        logging.debug(log_message("Stopping request handling, due cancellation"))
-        raise
-
-    except Exception as exc:
-        logging.exception(exc)
-
-        raise web.HTTPInternalServerError()
+    stream = ArchiveStream(loop, compressor.iter_archive(files, chunk_size, compresslevel))
+    logging.debug(log_message(
+        f"Read data compressor: {compressor.name} level {compresslevel} via {chunk_size} bytes chunks"))
 
     logging.debug(log_message("Writing was started"))
     try:
-        archive_chunk = await proc.stdout.read(chunk_size)
+        archive_chunk = await stream.read()
         logging.debug(log_message(f"Read {len(archive_chunk)} bytes to archive chunk"))
 
         while archive_chunk:
@@ -120,37 +228,42 @@ async def archive_files(loop, arch_cmd, chunk_size, headers, files_root, delay,
             await response.write(archive_chunk)
             logging.debug(log_message("Archive chunk was written"))
 
+            if cache_writer is not None:
+                await cache_writer.write(archive_chunk)
+
             if delay:
                 logging.debug(log_message(f"Additional delay {delay} s"))
                 await asyncio.sleep(delay)
 
-            archive_chunk = await proc.stdout.read(chunk_size)
+            archive_chunk = await stream.read()
             logging.debug(log_message(f"Read {len(archive_chunk)} bytes to archive chunk"))
 
         logging.debug(log_message("Writing was completed"))
 
+        if cache_writer is not None:
+            await cache_writer.commit()
+            logging.debug(log_message("Archive was cached"))
+
     except asyncio.CancelledError:
         response.force_close()
         logging.debug(log_message("Request handling was stopped, due cancellation"))
         raise
 
-    finally:
-        # waiting for last read attempt for graceful cancel
-        await proc.stdout.read(chunk_size)
+    except Exception:
+        # headers are sent already, so only closed connection tells client that archive is broken
+        response.force_close()
+        logging.exception(log_message("Archive can not be made"))
+        raise
 
-        if proc.returncode is None:
-            logging.debug(log_message(f"Compressor pid: {proc.pid} needs to be terminated"))
-            proc.terminate()
-            await proc.wait()
+    finally:
+        if cache_writer is not None:
+            await cache_writer.discard()
 
-        if proc.returncode is None:
-            logging.debug(log_message(f"Compressor pid: {proc.pid} was not terminated and needs to be killed"))
-            proc.kill()
-            await proc.wait()
+        # waiting for compression of the last chunk for graceful cancel
+        await stream.close()
+        logging.debug(log_message("Compressor was closed"))
 
-            logging.debug(log_message(f"Compressor pid: {proc.pid} was killed. Return code {proc.returncode}"))
-        else:
-            logging.debug(log_message(f"Compressor pid: {proc.pid} was terminated. Return code {proc.returncode}"))
+    return response
 
 
 async def handle_index_page(_):
@@ -162,10 +275,14 @@ async def handle_index_page(_):
     return web.Response(text=index_contents, content_type="text/html")
 
 
+async def handle_metrics(admission, _):
+    return web.json_response(admission.get_stats())
+
+
 def _non_empty_printable(string):
 
     if not string or not string.isprintable():
-        raise argparse.ArgumentError(
+        raise argparse.ArgumentTypeError(
             "Files root path has to be printable non-empty string.")
 
     return string
@@ -173,7 +290,7 @@ def _non_empty_printable(string):
 
 def _natural_number(number):
 
-    exception = argparse.ArgumentError("Chunk size has to be more than 0.")
+    exception = argparse.ArgumentTypeError("Chunk size and number of workers have to be more than 0.")
 
     try:
         number = int(number)
@@ -186,9 +303,24 @@ def _natural_number(number):
     return number
 
 
+def _non_negative_number(number):
+
+    exception = argparse.ArgumentTypeError("Cache size and queue size have to be non-negative.")
+
+    try:
+        number = int(number)
+    except ValueError:
+        raise exception
+
+    if number < 0:
+        raise exception
+
+    return number
+
+
 def _positive_number(number):
 
-    exception = argparse.ArgumentError("Delay has to be positive.")
+    exception = argparse.ArgumentTypeError("Delay and queue timeout have to be positive.")
 
     try:
         number = float(number)
@@ -201,6 +333,21 @@ def _positive_number(number):
     return number
 
 
+def _compress_level(level):
+
+    exception = argparse.ArgumentTypeError("Compression level has to be from 0 to 9.")
+
+    try:
+        level = int(level)
+    except ValueError:
+        raise exception
+
+    if not 0 <= level <= 9:
+        raise exception
+
+    return level
+
+
 def grab_args():
     parser = argparse.ArgumentParser(description="Files downloader web app")
     parser.add_argument("-l", "--log", action="store",
@@ -221,6 +368,26 @@ def grab_args():
     parser.add_argument("-c", "--compressor", action="store", choices=["zip", "gz"], metavar="{zip, gz}",
                         help="compression type, default is zip",
                         default=getenv("FDWA_COMPRESSOR", "zip"))
+    parser.add_argument("-z", "--compresslevel", action="store", type=_compress_level, metavar="{0-9}",
+                        help=f"deflate level of files, default is {DEFAULT_COMPRESSLEVEL}, 0 stores files uncompressed. "
+                             "Compressed media, e.g. jpg, png, mp4, are always stored.",
+                        default=int(getenv("FDWA_COMPRESSLEVEL", DEFAULT_COMPRESSLEVEL)))
+    parser.add_argument("-C", "--cachedir", action="store", type=_non_empty_printable,
+                        help="directory of archives cache, default is ./cache",
+                        default=getenv("FDWA_CACHEDIR", "./cache"))
+    parser.add_argument("-S", "--cachesize", action="store", type=_non_negative_number,
+                        help="max size of archives cache in bytes, default is 1073741824, 0 disables cache",
+                        default=int(getenv("FDWA_CACHESIZE", (1024 ** 3))))
+    parser.add_argument("-w", "--workers", action="store", type=_natural_number,
+                        help="max number of archives made at the same time, default is number of CPUs",
+                        default=int(getenv("FDWA_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("-q", "--queuesize", action="store", type=_non_negative_number,
+                        help="max number of requests waiting for a worker, default is 100, "
+                             "requests over it get 503 Service Unavailable",
+                        default=int(getenv("FDWA_QUEUESIZE", 100)))
+    parser.add_argument("-t", "--queuetimeout", action="store", type=_positive_number,
+                        help="max time of waiting for a worker in seconds, default is 30",
+                        default=float(getenv("FDWA_QUEUETIMEOUT", 30)))
 
     return parser.parse_args()
 
@@ -228,17 +395,17 @@ def grab_args():
 def setup_web_app(options):
 
     compressor = Compressors[options.compressor.upper()]
-    if not compressor.installed:
-        raise CompressorIsNotAvailable("Check if compressor's binaries are in the $PATH.")
-
     headers = get_headers("archive", compressor.extension)
+    cache = ArchiveCache(options.cachedir, options.cachesize) if options.cachesize else None
     web_app = web.Application()
-    archivate = partial(archive_files, web_app.loop, compressor.command,
+    admission = AdmissionController(options.workers, options.queuesize, options.queuetimeout)
+    archivate = partial(archive_files, compressor, options.compresslevel,
                         options.chunksize, headers, os.path.normpath(options.filesroot),
-                        options.delay)
+                        options.delay, cache, admission)
 
     web_app.add_routes([
         web.get("/", handle_index_page),
+        web.get("/metrics", partial(handle_metrics, admission)),
         web.get("/archive/{archive_hash}/", archivate)])
 
     return web_app